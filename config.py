@@ -1,6 +1,7 @@
 import os
 import json
 from dotenv import load_dotenv
+from utils.json_utils import json_loads
 
 # Load environment variables from .env file
 load_dotenv()
@@ -8,11 +9,15 @@ load_dotenv()
 # Default network endpoints
 DEFAULT_BSC_RPC = "https://bsc-dataseed.binance.org/"
 DEFAULT_POLYGON_RPC = "https://polygon-rpc.com/"
+DEFAULT_BSC_FALLBACK_RPC = "https://bsc-dataseed1.defibit.io/"
+DEFAULT_POLYGON_FALLBACK_RPC = "https://polygon-bor-rpc.publicnode.com"
 
 # Network configurations
 NETWORK_CONFIG = {
     "BSC": {
         "rpc_url": os.environ.get("BSC_RPC_URL", DEFAULT_BSC_RPC),
+        "fallback_rpc_url": os.environ.get("BSC_FALLBACK_RPC_URL", DEFAULT_BSC_FALLBACK_RPC),
+        "ws_url": os.environ.get("BSC_WS_URL"),
         "chain_id": 56,
         "explorer_url": "https://bscscan.com/",
         "name": "Binance Smart Chain",
@@ -21,6 +26,8 @@ NETWORK_CONFIG = {
     },
     "POLYGON": {
         "rpc_url": os.environ.get("POLYGON_RPC_URL", DEFAULT_POLYGON_RPC),
+        "fallback_rpc_url": os.environ.get("POLYGON_FALLBACK_RPC_URL", DEFAULT_POLYGON_FALLBACK_RPC),
+        "ws_url": os.environ.get("POLYGON_WS_URL"),
         "chain_id": 137,
         "explorer_url": "https://polygonscan.com/",
         "name": "Polygon",
@@ -81,6 +88,29 @@ FLASH_LOAN_CONFIG = {
     }
 }
 
+# Use frozensets for network membership checks
+for _cfg in list(DEX_CONFIG.values()) + list(FLASH_LOAN_CONFIG.values()):
+    _cfg["networks"] = frozenset(_cfg["networks"])
+del _cfg
+
+# Known contract addresses (lowercase) for O(1) address classification
+KNOWN_ROUTERS = frozenset(
+    address.lower() for dex_config in DEX_CONFIG.values()
+    for key, address in dex_config.items() if key.startswith("router_address_") and address
+)
+KNOWN_QUOTERS = frozenset(
+    address.lower() for dex_config in DEX_CONFIG.values()
+    for key, address in dex_config.items() if key.startswith("quoter_address_") and address
+)
+KNOWN_FACTORIES = frozenset(
+    address.lower() for dex_config in DEX_CONFIG.values()
+    for key, address in dex_config.items() if key.startswith("factory_address_") and address
+)
+KNOWN_FLASH_CONTRACTS = frozenset(
+    address.lower() for provider_config in FLASH_LOAN_CONFIG.values()
+    for key, address in provider_config.items() if key.startswith("contract_address_") and address
+)
+
 # Token configurations for common trading pairs
 DEFAULT_TOKEN_ADDRESSES = {
     "ETH_BSC": "0x2170Ed0880ac9A755fd29B2688956BD959F933F8",
@@ -96,7 +126,7 @@ DEFAULT_TOKEN_ADDRESSES = {
 }
 
 # ABI (Application Binary Interface) for smart contracts
-ERC20_ABI = json.loads(os.environ.get("ERC20_ABI", """[
+ERC20_ABI = json_loads(os.environ.get("ERC20_ABI", """[
     {"constant":true,"inputs":[],"name":"name","outputs":[{"name":"","type":"string"}],"type":"function"},
     {"constant":true,"inputs":[],"name":"symbol","outputs":[{"name":"","type":"string"}],"type":"function"},
     {"constant":true,"inputs":[],"name":"decimals","outputs":[{"name":"","type":"uint8"}],"type":"function"},
@@ -164,7 +194,7 @@ def get_token_addresses():
     env_token_addresses = os.environ.get("TOKEN_ADDRESSES")
     if env_token_addresses:
         try:
-            return json.loads(env_token_addresses)
+            return json_loads(env_token_addresses)
         except json.JSONDecodeError:
             pass
     return DEFAULT_TOKEN_ADDRESSES
@@ -183,4 +213,14 @@ def get_enabled_flash_loan_providers(network):
     return [
         provider for provider, config in FLASH_LOAN_CONFIG.items()
         if config["enabled"] and network in config["networks"]
-    ]
\ No newline at end of file
+    ]
+
+# Enabled networks and their enabled flash loan providers, computed once at import
+ENABLED_NETWORKS = tuple(
+    network for network, network_config in NETWORK_CONFIG.items()
+    if network_config.get("enabled", False)
+)
+ENABLED_FLASH_LOAN_PROVIDERS_BY_NETWORK = {
+    network: tuple(get_enabled_flash_loan_providers(network))
+    for network in ENABLED_NETWORKS
+}
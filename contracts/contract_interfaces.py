@@ -1,14 +1,286 @@
 import logging
 import os
-import json
-from typing import Dict, List, Optional, Any
+import asyncio
+import sqlite3
+import time
+from typing import Dict, List, Optional, Any, Tuple, Union
 from web3 import Web3
+from web3.exceptions import ContractLogicError, Web3Exception
+from utils.json_utils import json_loads
+from eth_abi import decode as abi_decode
+from eth_utils import function_signature_to_4byte_selector
 
 logger = logging.getLogger(__name__)
 
+# Multicall3 is deployed at the same address on BSC and Polygon
+MULTICALL3_ADDRESS = os.environ.get("MULTICALL3_ADDRESS", "0xcA11bde05977b3631167028862bE2a173976CA11")
+MULTICALL3_ABI = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"name": "target", "type": "address"},
+                    {"name": "allowFailure", "type": "bool"},
+                    {"name": "callData", "type": "bytes"}
+                ],
+                "name": "calls",
+                "type": "tuple[]"
+            }
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+                "components": [
+                    {"name": "success", "type": "bool"},
+                    {"name": "returnData", "type": "bytes"}
+                ],
+                "name": "returnData",
+                "type": "tuple[]"
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function"
+    }
+]
+
+# Maximum block range per eth_getLogs request
+EVENT_BLOCK_WINDOW = 10000
+
+# keccak('balanceOf(address)')[:4]
+BALANCE_OF_SELECTOR = bytes.fromhex('70a08231')
+
+# Precomputed call data and output types for the argument-less ERC20 views
+ERC20_VIEW_CALLS = {
+    'name': ('0x06fdde03', ['string']),
+    'symbol': ('0x95d89b41', ['string']),
+    'decimals': ('0x313ce567', ['uint8']),
+    'totalSupply': ('0x18160ddd', ['uint256'])
+}
+
+
+def address_to_bytes(address: Union[str, bytes]) -> bytes:
+    """
+    Convert a hex address to its 20-byte form
+    
+    Addresses are kept as bytes internally and only checksummed at the RPC
+    boundary.
+    
+    Args:
+        address: Hex address string (with or without 0x) or 20-byte address
+        
+    Returns:
+        20-byte address
+    """
+    if isinstance(address, bytes):
+        return address
+    return bytes.fromhex(address.removeprefix('0x').removeprefix('0X'))
+
+
+def balance_of_call_data(owner: bytes) -> bytes:
+    """
+    Encode balanceOf(owner) call data without going through the contract ABI
+    
+    Args:
+        owner: 20-byte address to check balance for
+        
+    Returns:
+        ABI-encoded call data
+    """
+    # An address argument is the 20 bytes left-padded to a 32-byte word
+    return BALANCE_OF_SELECTOR + bytes(12) + owner
+
+
+class BalanceBatcher:
+    """
+    Coalesces ERC20 balanceOf queries into Multicall3 aggregate3 calls
+    and caches the results per block
+    """
+    
+    def __init__(self, web3_instance, flush_interval: float = 0.05, max_batch_size: int = 500,
+                 block_cache_ttl: float = 1.0):
+        """
+        Initialize the balance batcher
+        
+        Args:
+            web3_instance: Web3 instance
+            flush_interval: Seconds to wait for more queries before flushing
+            max_batch_size: Number of pending queries that triggers an immediate flush
+            block_cache_ttl: Seconds after reading a block during which its cached
+                balances are served without a new query (below the block time of
+                the supported networks)
+        """
+        self.web3 = web3_instance
+        self.flush_interval = flush_interval
+        self.max_batch_size = max_batch_size
+        self.block_cache_ttl = block_cache_ttl
+        
+        self.multicall = web3_instance.eth.contract(
+            address=Web3.toChecksumAddress(MULTICALL3_ADDRESS),
+            abi=MULTICALL3_ABI
+        )
+        
+        # (token, owner) -> Future shared by every caller queued in the current window
+        self._pending: Dict[Tuple[bytes, bytes], asyncio.Future] = {}
+        self._flush_task = None
+        
+        # (token, owner, block_number) -> balance in wei
+        self._balance_cache: Dict[Tuple[bytes, bytes, int], int] = {}
+        self._cache_block = None
+        self._cache_block_seen = 0.0  # monotonic time the cache block was last read
+        
+    def queue(self, token: Union[str, bytes], address: Union[str, bytes]) -> asyncio.Future:
+        """
+        Queue a balanceOf query for the next batch
+        
+        Args:
+            token: Token contract address
+            address: Address to check balance for
+            
+        Returns:
+            Future resolving to the balance in wei
+        """
+        key = (address_to_bytes(token), address_to_bytes(address))
+        
+        future = self._pending.get(key)
+        if future is not None:
+            return future
+            
+        future = asyncio.get_running_loop().create_future()
+        
+        # Serve repeat reads within the current block from the cache right away
+        cache_block = self._cache_block
+        if cache_block is not None and time.monotonic() - self._cache_block_seen < self.block_cache_ttl:
+            cached = self._balance_cache.get((key[0], key[1], cache_block))
+            if cached is not None:
+                future.set_result(cached)
+                return future
+                
+        self._pending[key] = future
+        
+        if len(self._pending) >= self.max_batch_size:
+            self._schedule_flush(0)
+        elif self._flush_task is None:
+            self._schedule_flush(self.flush_interval)
+            
+        return future
+        
+    def _schedule_flush(self, delay: float):
+        """Schedule a flush of the pending queries after a delay"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+        self._flush_task = asyncio.create_task(self._flush_after(delay))
+        
+    async def _flush_after(self, delay: float):
+        """Flush pending queries after a delay"""
+        if delay:
+            await asyncio.sleep(delay)
+            
+        batch = self._pending
+        self._pending = {}
+        self._flush_task = None
+        
+        if not batch:
+            return
+            
+        try:
+            loop = asyncio.get_running_loop()
+            results = await loop.run_in_executor(None, self._execute_batch, list(batch))
+            
+            for key, future in batch.items():
+                if future.done():
+                    continue
+                result = results.get(key)
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+                    
+        except Exception as e:
+            logger.error(f"Error executing balance batch: {str(e)}")
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+                    
+    def _execute_batch(self, keys: List[Tuple[bytes, bytes]]) -> Dict[Tuple[bytes, bytes], Any]:
+        """
+        Resolve a batch of balance queries with a single multicall
+        
+        Args:
+            keys: List of (token, owner) pairs
+            
+        Returns:
+            Dictionary mapping each pair to its balance in wei or an exception
+        """
+        block_number = self.web3.eth.block_number
+        
+        # Balances are only valid for the block they were read at
+        if block_number != self._cache_block:
+            self._balance_cache = {}
+            self._cache_block = block_number
+        self._cache_block_seen = time.monotonic()
+            
+        results = {}
+        misses = []
+        for key in keys:
+            cached = self._balance_cache.get((key[0], key[1], block_number))
+            if cached is not None:
+                results[key] = cached
+            else:
+                misses.append(key)
+                
+        if not misses:
+            return results
+            
+        calls = [
+            (
+                Web3.toChecksumAddress(token),
+                True,
+                balance_of_call_data(owner)
+            )
+            for token, owner in misses
+        ]
+        
+        responses = self.multicall.functions.aggregate3(calls).call(block_identifier=block_number)
+        
+        for (token, owner), (success, return_data) in zip(misses, responses):
+            if not success or len(return_data) < 32:
+                results[(token, owner)] = ValueError(f"balanceOf call failed for token 0x{token.hex()}")
+                continue
+                
+            balance_wei = abi_decode(['uint256'], return_data)[0]
+            self._balance_cache[(token, owner, block_number)] = balance_wei
+            results[(token, owner)] = balance_wei
+            
+        return results
+
+
+# One batcher per Web3 instance, keyed by the instance itself so a key can
+# never be reused by another instance
+_balance_batchers: Dict[Any, BalanceBatcher] = {}
+
+
+def get_balance_batcher(web3_instance) -> BalanceBatcher:
+    """
+    Get the shared balance batcher for a Web3 instance
+    
+    Args:
+        web3_instance: Web3 instance
+        
+    Returns:
+        Balance batcher bound to the Web3 instance
+    """
+    batcher = _balance_batchers.get(web3_instance)
+    if batcher is None:
+        batcher = BalanceBatcher(web3_instance)
+        _balance_batchers[web3_instance] = batcher
+    return batcher
+
+
 class FlashLoanContract:
     """Interface for flash loan contracts"""
     
+    __slots__ = ('address', 'address_str', 'abi', 'web3', 'contract', '_fn_by_name', '_signatures', '_selectors')
+    
     def __init__(self, address: str, abi: List[Dict], web3_instance):
         """
         Initialize the flash loan contract interface
@@ -18,16 +290,31 @@ class FlashLoanContract:
             abi: Contract ABI
             web3_instance: Web3 instance
         """
-        self.address = address
+        self.address = address_to_bytes(address)
+        self.address_str = Web3.toChecksumAddress(address)
         self.abi = abi
         self.web3 = web3_instance
         
         # Create contract instance
         self.contract = web3_instance.eth.contract(
-            address=Web3.toChecksumAddress(address),
+            address=self.address_str,
             abi=abi
         )
         
+        # Index ABI functions by name and precompute their signatures and 4-byte selectors
+        self._fn_by_name = {
+            item['name']: item for item in abi
+            if item.get('type') == 'function' and item.get('name')
+        }
+        self._signatures = {
+            name: f"{name}({','.join(inp.get('type') for inp in item.get('inputs', []))})"
+            for name, item in self._fn_by_name.items()
+        }
+        self._selectors = {
+            name: function_signature_to_4byte_selector(signature)
+            for name, signature in self._signatures.items()
+        }
+        
     def get_function_signature(self, function_name: str) -> str:
         """
         Get function signature for a contract function
@@ -38,14 +325,24 @@ class FlashLoanContract:
         Returns:
             Function signature
         """
-        for item in self.abi:
-            if item.get('type') == 'function' and item.get('name') == function_name:
-                inputs = item.get('inputs', [])
-                types = [inp.get('type') for inp in inputs]
-                return f"{function_name}({','.join(types)})"
-                
+        signature = self._signatures.get(function_name)
+        if signature is not None:
+            return signature
+            
         return f"{function_name}()"
         
+    def get_selector(self, function_name: str) -> Optional[bytes]:
+        """
+        Get the 4-byte selector for a contract function
+        
+        Args:
+            function_name: Name of the function
+            
+        Returns:
+            Function selector or None if the function is not in the ABI
+        """
+        return self._selectors.get(function_name)
+        
     def get_required_gas(self, function_name: str, *args) -> int:
         """
         Estimate required gas for a function call
@@ -56,45 +353,81 @@ class FlashLoanContract:
             
         Returns:
             Estimated gas amount
+            
+        Raises:
+            ContractLogicError: If the call would revert
         """
+        # Get function from contract
+        func = getattr(self.contract.functions, function_name)
+        
         try:
-            # Get function from contract
-            func = getattr(self.contract.functions, function_name)
-            
             # Estimate gas
             return func(*args).estimateGas()
-        except Exception as e:
-            logger.error(f"Error estimating gas for {function_name}: {str(e)}")
+        except ContractLogicError:
+            # A revert is informative, let the caller decide what to do
+            raise
+        except (Web3Exception, OSError) as e:
+            # RPC or connection failure, fall back to a default
+            logger.debug("Gas estimation RPC failure for %s: %s", function_name, e)
             return 500000  # Default gas limit
             
-    def get_contract_events(self, event_name: str, from_block: int, to_block: int = 'latest') -> List[Dict]:
+    def iter_contract_events(self, event_name: str, from_block: int, to_block: int = 'latest'):
         """
-        Get events emitted by the contract
+        Iterate over events emitted by the contract
+        
+        Large block ranges are queried in windows of EVENT_BLOCK_WINDOW blocks
+        to stay under provider log limits.
         
         Args:
             event_name: Name of the event
             from_block: Starting block number
             to_block: Ending block number
             
-        Returns:
-            List of event data dictionaries
+        Yields:
+            Event data dictionaries
+            
+        Raises:
+            Exception: If a window cannot be fetched; earlier windows have
+                already been yielded, so the iteration is incomplete
         """
-        try:
-            # Get event from contract
-            event = getattr(self.contract.events, event_name)
+        # Get event from contract
+        event = getattr(self.contract.events, event_name)
+        
+        if to_block == 'latest':
+            to_block = self.web3.eth.block_number
             
-            # Get event logs
-            logs = event.getLogs(fromBlock=from_block, toBlock=to_block)
+        for window_start in range(from_block, to_block + 1, EVENT_BLOCK_WINDOW):
+            window_end = min(window_start + EVENT_BLOCK_WINDOW - 1, to_block)
             
-            # Process logs
-            events = []
+            try:
+                logs = event.getLogs(fromBlock=window_start, toBlock=window_end)
+            except Exception as e:
+                logger.error(f"Error getting events for {event_name} in blocks {window_start}-{window_end}: {str(e)}")
+                raise
+                
             for log in logs:
-                event_data = dict(log.args)
-                event_data['block_number'] = log.blockNumber
-                event_data['transaction_hash'] = log.transactionHash.hex()
-                events.append(event_data)
+                yield {
+                    **dict(log.args),
+                    'block_number': log.blockNumber,
+                    'transaction_hash': log.transactionHash.hex()
+                }
                 
-            return events
+
+    def get_contract_events(self, event_name: str, from_block: int, to_block: int = 'latest') -> List[Dict]:
+        """
+        Get events emitted by the contract
+        
+        Args:
+            event_name: Name of the event
+            from_block: Starting block number
+            to_block: Ending block number
+            
+        Returns:
+            List of event data dictionaries, or an empty list if any block
+            window could not be fetched
+        """
+        try:
+            return list(self.iter_contract_events(event_name, from_block, to_block))
         except Exception as e:
             logger.error(f"Error getting events for {event_name}: {str(e)}")
             return []
@@ -118,7 +451,7 @@ class FlashLoanContractFactory:
         """
         try:
             # Load configuration
-            contract_addresses = json.loads(os.environ.get("FLASH_LOAN_CONTRACT_ADDRESSES", "{}"))
+            contract_addresses = json_loads(os.environ.get("FLASH_LOAN_CONTRACT_ADDRESSES", "{}"))
             
             # Get contract address
             address_key = f"{provider}_{network}"
@@ -130,7 +463,7 @@ class FlashLoanContractFactory:
                 
             # Load ABI
             abi_key = f"{provider}_ABI"
-            abi = json.loads(os.environ.get(abi_key, "[]"))
+            abi = json_loads(os.environ.get(abi_key, "[]"))
             
             if not abi:
                 logger.error(f"No ABI found for {abi_key}")
@@ -144,22 +477,105 @@ class FlashLoanContractFactory:
             return None
 
 
+class TokenMetadataStore:
+    """Persistent cache for immutable token metadata (name, symbol, decimals)"""
+    
+    def __init__(self, db_path: str):
+        """
+        Initialize the token metadata store
+        
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path
+        self._conn = None
+        
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use"""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS token_metadata ("
+                "address TEXT NOT NULL, network TEXT NOT NULL, "
+                "name TEXT, symbol TEXT, decimals INTEGER, "
+                "PRIMARY KEY (address, network))"
+            )
+            self._conn.commit()
+        return self._conn
+        
+    def get(self, address: str, network: str) -> Optional[Dict]:
+        """
+        Get stored metadata for a token
+        
+        Args:
+            address: Token contract address
+            network: Network name
+            
+        Returns:
+            Dictionary with name, symbol and decimals or None if not stored
+        """
+        try:
+            row = self._connect().execute(
+                "SELECT name, symbol, decimals FROM token_metadata WHERE address = ? AND network = ?",
+                (address.lower(), network)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Error reading token metadata for {address}: {str(e)}")
+            return None
+            
+        if row is None:
+            return None
+            
+        return {'name': row[0], 'symbol': row[1], 'decimals': row[2]}
+        
+    def put(self, address: str, network: str, name: str, symbol: str, decimals: int):
+        """
+        Store metadata for a token
+        
+        Args:
+            address: Token contract address
+            network: Network name
+            name: Token name
+            symbol: Token symbol
+            decimals: Token decimals
+        """
+        try:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO token_metadata (address, network, name, symbol, decimals) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (address.lower(), network, name, symbol, decimals)
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Error storing token metadata for {address}: {str(e)}")
+
+
+# Shared metadata store for all token contracts
+token_metadata_store = TokenMetadataStore(os.environ.get("TOKEN_METADATA_DB", "token_metadata.db"))
+
+
 class TokenContract:
     """Interface for ERC20 token contracts"""
     
-    def __init__(self, address: str, web3_instance):
+    __slots__ = ('address', 'address_str', 'network', 'web3', 'abi', 'contract', 'info_cache')
+    
+    def __init__(self, address: str, web3_instance, network: str = None):
         """
         Initialize the token contract interface
         
         Args:
             address: Token contract address
             web3_instance: Web3 instance
+            network: Network name, used to key persisted token metadata
         """
-        self.address = address
+        self.address = address_to_bytes(address)
+        self.address_str = Web3.toChecksumAddress(address)
+        self.network = network
         self.web3 = web3_instance
         
         # Load standard ERC20 ABI
-        self.abi = json.loads(os.environ.get("ERC20_ABI", """[
+        self.abi = json_loads(os.environ.get("ERC20_ABI", """[
             {"constant":true,"inputs":[],"name":"name","outputs":[{"name":"","type":"string"}],"type":"function"},
             {"constant":true,"inputs":[],"name":"symbol","outputs":[{"name":"","type":"string"}],"type":"function"},
             {"constant":true,"inputs":[],"name":"decimals","outputs":[{"name":"","type":"uint8"}],"type":"function"},
@@ -169,13 +585,27 @@ class TokenContract:
         
         # Create contract instance
         self.contract = web3_instance.eth.contract(
-            address=Web3.toChecksumAddress(address),
+            address=self.address_str,
             abi=self.abi
         )
         
         # Cache for token info
         self.info_cache = {}
         
+    def _call_view(self, function_name: str) -> Any:
+        """
+        Call an argument-less ERC20 view function using precomputed call data
+        
+        Args:
+            function_name: Name of the function
+            
+        Returns:
+            Decoded return value
+        """
+        call_data, output_types = ERC20_VIEW_CALLS[function_name]
+        raw = self.web3.eth.call({'to': self.address_str, 'data': call_data})
+        return abi_decode(output_types, raw)[0]
+        
     async def get_token_info(self) -> Dict:
         """
         Get basic token information
@@ -187,11 +617,22 @@ class TokenContract:
             return self.info_cache
             
         try:
-            # Get token info
-            name = self.contract.functions.name().call()
-            symbol = self.contract.functions.symbol().call()
-            decimals = self.contract.functions.decimals().call()
-            total_supply = self.contract.functions.totalSupply().call()
+            # Name, symbol and decimals never change, so only fetch them once
+            metadata = token_metadata_store.get(self.address_str, self.network) if self.network else None
+            
+            if metadata:
+                name = metadata['name']
+                symbol = metadata['symbol']
+                decimals = metadata['decimals']
+            else:
+                name = self._call_view('name')
+                symbol = self._call_view('symbol')
+                decimals = self._call_view('decimals')
+                
+                if self.network:
+                    token_metadata_store.put(self.address_str, self.network, name, symbol, decimals)
+                    
+            total_supply = self._call_view('totalSupply')
             
             # Cache results
             self.info_cache = {
@@ -205,7 +646,7 @@ class TokenContract:
             return self.info_cache
             
         except Exception as e:
-            logger.error(f"Error getting token info for {self.address}: {str(e)}")
+            logger.error(f"Error getting token info for {self.address_str}: {str(e)}")
             
             # Return partial info if available
             if self.info_cache:
@@ -234,17 +675,15 @@ class TokenContract:
             # Get token info for decimals
             token_info = await self.get_token_info()
             
-            # Get balance
-            balance_wei = self.contract.functions.balanceOf(
-                Web3.toChecksumAddress(address)
-            ).call()
+            # Get balance (batched with other pending balanceOf queries)
+            balance_wei = await get_balance_batcher(self.web3).queue(self.address, address)
             
             # Format balance
             balance = balance_wei / (10 ** token_info['decimals'])
             
             return {
                 'address': address,
-                'token_address': self.address,
+                'token_address': self.address_str,
                 'token_symbol': token_info['symbol'],
                 'balance_wei': balance_wei,
                 'balance': balance
@@ -254,7 +693,7 @@ class TokenContract:
             logger.error(f"Error getting balance for {address}: {str(e)}")
             return {
                 'address': address,
-                'token_address': self.address,
+                'token_address': self.address_str,
                 'error': str(e),
                 'balance_wei': 0,
                 'balance': 0
@@ -3,8 +3,9 @@ import os
 import json
 from typing import Dict, List, Optional, Any
 import config
-from contracts.contract_interfaces import FlashLoanContract, TokenContract, FlashLoanContractFactory
-from core.web3_manager import web3_manager
+from contracts.contract_interfaces import FlashLoanContract, TokenContract, FlashLoanContractFactory, address_to_bytes
+from core.web3_manager import get_web3_manager_sync
+from utils.json_utils import json_loads
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +19,9 @@ class ContractManager:
         self.flash_loan_contracts = {}
         self.token_contracts = {}
         
+        # Provider -> network -> address, maintained as contracts are added
+        self._addresses_view = {}
+        
         # Load ABIs
         self._load_abis()
         
@@ -35,7 +39,7 @@ class ContractManager:
             
             if abi_json:
                 try:
-                    self.flash_loan_abis[provider] = json.loads(abi_json)
+                    self.flash_loan_abis[provider] = json_loads(abi_json)
                     logger.info(f"Loaded ABI for {provider} from environment")
                 except json.JSONDecodeError:
                     logger.error(f"Invalid JSON in {abi_env_var}")
@@ -44,8 +48,8 @@ class ContractManager:
                 try:
                     abi_path = f"contracts/abis/{provider.lower()}_flashloan.json"
                     if os.path.exists(abi_path):
-                        with open(abi_path, 'r') as f:
-                            self.flash_loan_abis[provider] = json.load(f)
+                        with open(abi_path, 'rb') as f:
+                            self.flash_loan_abis[provider] = json_loads(f.read())
                         logger.info(f"Loaded ABI for {provider} from file")
                     else:
                         logger.warning(f"No ABI file found for {provider} at {abi_path}")
@@ -57,17 +61,18 @@ class ContractManager:
         
     def _initialize_contracts(self):
         """Initialize contract interfaces for all configured networks"""
-        for network, network_config in config.NETWORK_CONFIG.items():
-            if not network_config.get("enabled", False):
+        for network in config.ENABLED_NETWORKS:
+            providers = config.ENABLED_FLASH_LOAN_PROVIDERS_BY_NETWORK.get(network, ())
+            if not providers:
                 continue
                 
-            web3_instance = web3_manager.get_web3(network)
+            web3_instance = get_web3_manager_sync().get_web3(network)
             if not web3_instance:
                 logger.warning(f"No Web3 instance for {network}, skipping contract initialization")
                 continue
                 
             # Initialize flash loan contracts
-            for provider in config.get_enabled_flash_loan_providers(network):
+            for provider in providers:
                 self._initialize_flash_loan_contract(provider, network, web3_instance)
                 
     def _initialize_flash_loan_contract(self, provider: str, network: str, web3_instance):
@@ -105,6 +110,7 @@ class ContractManager:
             # Store in dictionary
             key = f"{provider}_{network}"
             self.flash_loan_contracts[key] = contract
+            self._addresses_view.setdefault(provider, {})[network] = contract.address_str
             
             logger.info(f"Initialized flash loan contract for {provider} on {network}")
             
@@ -136,17 +142,17 @@ class ContractManager:
         Returns:
             Token contract interface
         """
-        key = f"{token_address}_{network}"
+        key = (address_to_bytes(token_address), network)
         
         if key in self.token_contracts:
             return self.token_contracts[key]
             
-        web3_instance = web3_manager.get_web3(network)
+        web3_instance = get_web3_manager_sync().get_web3(network)
         if not web3_instance:
             logger.warning(f"No Web3 instance for {network}, cannot create token contract")
             return None
             
-        token_contract = TokenContract(token_address, web3_instance)
+        token_contract = TokenContract(token_address, web3_instance, network)
         self.token_contracts[key] = token_contract
         
         return token_contract
@@ -157,18 +163,9 @@ class ContractManager:
         
         Returns:
             Dictionary mapping providers and networks to contract addresses
+            (shared view, do not mutate)
         """
-        result = {}
-        
-        for key, contract in self.flash_loan_contracts.items():
-            provider, network = key.split('_')
-            
-            if provider not in result:
-                result[provider] = {}
-                
-            result[provider][network] = contract.address
-            
-        return result
+        return self._addresses_view
         
     def get_available_flash_loan_providers(self) -> Dict[str, List[str]]:
         """
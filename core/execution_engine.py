@@ -1,16 +1,82 @@
 import logging
 import asyncio
 import time
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Callable
 import os
 from web3 import Web3
 from web3.middleware import geth_poa_middleware
+from web3.exceptions import TimeExhausted, TransactionNotFound
 import json
+import aiohttp
+from decimal import Decimal
+import numpy as np
 from eth_account import Account
+from eth_account.messages import encode_defunct
+from eth_abi import decode as abi_decode, encode as abi_encode
 from hexbytes import HexBytes
 
 logger = logging.getLogger(__name__)
 
+class SeenRing:
+    """
+    Fixed-size open-addressed set of recently seen transaction hashes
+    
+    Stores the first 8 bytes of each hash, which are already uniformly
+    distributed, in a power-of-two uint64 array. When the probe window is
+    full the slot at the hash position is overwritten, so memory
+    stays fixed and old hashes are eventually forgotten.
+    """
+    
+    MAX_PROBES = 8
+    
+    def __init__(self, capacity: int = 65536):
+        """
+        Initialize the ring
+        
+        Args:
+            capacity: Number of slots, rounded up to a power of two
+        """
+        capacity = 1 << max(capacity - 1, 1).bit_length()
+        self._mask = capacity - 1
+        self._slots = np.zeros(capacity, dtype=np.uint64)
+        
+    @staticmethod
+    def _key(tx_hash) -> int:
+        """Map a hash (bytes or hex string) to a non-zero 64-bit key"""
+        if isinstance(tx_hash, str):
+            key = int(tx_hash[2:18], 16)
+        else:
+            key = int.from_bytes(tx_hash[:8], 'big')
+        return key or 1  # 0 marks an empty slot
+        
+    def add(self, tx_hash) -> bool:
+        """
+        Record a transaction hash
+        
+        Args:
+            tx_hash: Transaction hash
+            
+        Returns:
+            True if the hash was already present, False otherwise
+        """
+        key = self._key(tx_hash)
+        slots = self._slots
+        home = key & self._mask
+        
+        idx = home
+        for _ in range(self.MAX_PROBES):
+            slot = int(slots[idx])
+            if slot == key:
+                return True
+            if slot == 0:
+                slots[idx] = key
+                return False
+            idx = (idx + 1) & self._mask
+            
+        slots[home] = key
+        return False
+        
+
 class ExecutionEngine:
     """
     Handles the actual execution of flash loan arbitrage transactions on blockchain
@@ -35,27 +101,102 @@ class ExecutionEngine:
         self.web3_bsc.middleware_onion.inject(geth_poa_middleware, layer=0)
         self.web3_polygon.middleware_onion.inject(geth_poa_middleware, layer=0)
         
-        self.private_key = os.environ.get("WALLET_PRIVATE_KEY")
+        # Read all environment settings once
+        self._load_config()
+        
+        self.private_key = self._config['private_key']
         if not self.private_key or not self.private_key.startswith("0x"):
             self.private_key = "0x" + self.private_key if self.private_key else None
             
         # Initialize contract ABIs
         self.load_contract_abis()
         
+        # Parse mempool filter settings once instead of per transaction
+        self._load_filter_config()
+        
+        # Build contract instances and checksummed addresses once
+        self._load_execution_config()
+        
         # Setup Flashbots integration
         self.setup_flashbots()
         
         # Mempool monitoring status
         self.mempool_monitoring = False
         
+        # Websocket RPC URLs for push-based mempool monitoring (optional)
+        self.ws_urls = self._config['ws_urls']
+        
+        # Gas price cache per network: (fetched_at, gas_price)
+        self._gas_price_cache: Dict[str, tuple] = {}
+        self._gas_price_ttl = 0.5  # seconds
+        
+        # Locally tracked next nonce per network, guarded per network so
+        # concurrent trades never reserve the same nonce. Reserved nonces stay
+        # in _reserved_nonces until sent or released; a resync from the node
+        # is deferred until none are in flight
+        self._nonces: Dict[str, int] = {}
+        self._nonce_locks: Dict[str, asyncio.Lock] = {}
+        self._reserved_nonces: Dict[str, set] = {}
+        self._nonce_resync: set = set()
+        
+        # Pending transactions waiting for analysis
+        self._tx_queue = asyncio.Queue(maxsize=10000)
+        self._mempool_worker_count = self._config['mempool_workers']
+        self._mempool_batch_size = 100
+        self._mempool_poll_interval = self._config['mempool_poll_interval_ms'] / 1000
+        
+        # Recently analyzed transaction hashes per network
+        self._seen_tx: Dict[str, SeenRing] = {}
+        self._seen_tx_capacity = 65536
+        
+    def _load_config(self):
+        """Read and parse all environment settings into a single snapshot"""
+        try:
+            self._config = {
+                'private_key': os.environ.get("WALLET_PRIVATE_KEY"),
+                'flash_loan_abi': json.loads(os.environ.get("FLASH_LOAN_CONTRACT_ABI", "[]")),
+                'erc20_abi': json.loads(os.environ.get("ERC20_ABI", "[]")),
+                'dex_addresses': json.loads(os.environ.get("DEX_ADDRESSES", "[]")),
+                'token_addresses': json.loads(os.environ.get("TOKEN_ADDRESSES", "{}")),
+                'min_tx_value_eth': Decimal(os.environ.get("MIN_SIGNIFICANT_TX_VALUE_ETH", "1.0")),
+                'large_tx_alert_eth': Decimal(os.environ.get("LARGE_TX_ALERT_THRESHOLD_ETH", "10.0")),
+                'mempool_workers': int(os.environ.get("MEMPOOL_WORKERS", "16")),
+                'mempool_poll_interval_ms': int(os.environ.get("MEMPOOL_POLL_INTERVAL_MS", "250")),
+                'ws_urls': {
+                    'BSC': os.environ.get("BSC_WS_URL"),
+                    'POLYGON': os.environ.get("POLYGON_WS_URL")
+                },
+                'use_flashbots': os.environ.get("USE_FLASHBOTS", "true").lower() == "true",
+                'flashbots_relay_bsc': os.environ.get(
+                    "FLASHBOTS_RELAY_BSC",
+                    "https://bsc-flashbots-relay.ethermine.org"
+                ),
+                'flashbots_relay_polygon': os.environ.get(
+                    "FLASHBOTS_RELAY_POLYGON",
+                    "https://polygon-flashbots-relay.ethermine.org"
+                ),
+                'flashbots_bundle_blocks': int(os.environ.get("FLASHBOTS_BUNDLE_BLOCKS", "5")),
+                'flashbots_public_fallback': os.environ.get("FLASHBOTS_PUBLIC_FALLBACK", "false").lower() == "true"
+            }
+        except Exception as e:
+            logger.error(f"Error loading execution engine configuration: {str(e)}")
+            raise
+            
+    def reload_config(self):
+        """Re-read environment settings and rebuild the filters derived from them"""
+        self._load_config()
+        self._load_filter_config()
+        self.ws_urls = self._config['ws_urls']
+        logger.info("Reloaded execution engine configuration")
+        
     def load_contract_abis(self):
-        """Load contract ABIs from JSON files or environment variables"""
+        """Load contract ABIs from the configuration snapshot"""
         try:
             # Flash loan contracts ABI
-            self.flash_loan_abi = json.loads(os.environ.get("FLASH_LOAN_CONTRACT_ABI", "[]"))
+            self.flash_loan_abi = self._config['flash_loan_abi']
             
             # Token ABIs
-            self.erc20_abi = json.loads(os.environ.get("ERC20_ABI", "[]"))
+            self.erc20_abi = self._config['erc20_abi']
             
             # If ABIs are empty, use default minimal ABIs
             if not self.flash_loan_abi:
@@ -96,18 +237,132 @@ class ExecutionEngine:
             logger.error(f"Error loading contract ABIs: {str(e)}")
             raise
             
+    def _load_filter_config(self):
+        """Load the settings used to filter mempool transactions"""
+        # Common function signatures for swaps (first 4 bytes of keccak hash)
+        self._swap_sigs = frozenset([
+            "0x38ed1739",  # swapExactTokensForTokens
+            "0x8803dbee",  # swapTokensForExactTokens
+            "0x7ff36ab5",  # swapExactETHForTokens
+            "0x4a25d94a",  # swapTokensForExactETH
+            "0x18cbafe5",  # swapExactTokensForETH
+            "0xfb3bdb41",  # swapETHForExactTokens
+            "0x5c11d795"   # swap
+        ])
+        self._swap_selectors_int = frozenset(int(sig, 16) for sig in self._swap_sigs)
+        
+        # Known DEX contract addresses, in lowercase and checksummed form so
+        # the 'to' field of a fetched transaction can be looked up as-is
+        dex_addresses = self._config['dex_addresses']
+        self._dex_addresses = frozenset(
+            [addr.lower() for addr in dex_addresses] +
+            [Web3.toChecksumAddress(addr) for addr in dex_addresses]
+        )
+        
+        # Byte arrays of the same sets for filtering whole batches with NumPy
+        self._dex_np = np.array(
+            [list(bytes.fromhex(addr[2:] if addr[:2].lower() == '0x' else addr)) for addr in dex_addresses],
+            dtype=np.uint8
+        ).reshape(-1, 20)
+        self._sel_np = np.array(sorted(self._swap_selectors_int), dtype=np.uint32)
+        
+        # Value thresholds in wei so the hot path compares integers
+        self._min_tx_wei = Web3.toWei(self._config['min_tx_value_eth'], 'ether')
+        self._large_tx_alert_wei = Web3.toWei(self._config['large_tx_alert_eth'], 'ether')
+        
+    def _load_execution_config(self):
+        """Build the contract instances and addresses used to execute trades"""
+        # Flash loan contract instances per network
+        self._contracts = {}
+        for network, web3 in (('BSC', self.web3_bsc), ('POLYGON', self.web3_polygon)):
+            contract_address = self.flash_loan_contracts.get(network)
+            if contract_address:
+                self._contracts[network] = web3.eth.contract(
+                    address=Web3.toChecksumAddress(contract_address),
+                    abi=self.flash_loan_abi
+                )
+                
+        # Checksummed token addresses keyed by (symbol, network)
+        self._token_addresses = {}
+        for key, address in self._config['token_addresses'].items():
+            symbol, _, network = key.rpartition('_')
+            self._token_addresses[(symbol, network)] = Web3.toChecksumAddress(address)
+            
+        # Trading account, derived from the private key once
+        self._account = Account.from_key(self.private_key) if self.private_key else None
+        self._wallet_address = self._account.address if self._account else None
+        
+        # executeFlashloan selector and argument types for encoding calldata
+        # directly instead of through the contract object
+        flash_loan_fn = next(
+            (item for item in self.flash_loan_abi
+             if item.get('type') == 'function' and item.get('name') == 'executeFlashloan'),
+            None
+        )
+        self._flash_loan_types = (
+            [item['type'] for item in flash_loan_fn['inputs']] if flash_loan_fn
+            else ['address', 'address', 'uint256', 'string', 'string']
+        )
+        self._flash_loan_selector = bytes(
+            Web3.keccak(text=f"executeFlashloan({','.join(self._flash_loan_types)})")[:4]
+        )
+        
+        # Chain IDs per network, read from the node on first use
+        self._chain_ids: Dict[str, int] = {}
+        
+        # Profit event decoders keyed by raw topic0
+        self._profit_topics = self._build_profit_topics()
+        
+    def _build_profit_topics(self) -> Dict[bytes, Callable[[Any], int]]:
+        """
+        Build decoders for flash loan contract events that report a profit
+        
+        Returns:
+            Dictionary mapping event topic0 bytes to a function that returns
+            the profit in wei from a log
+        """
+        decoders = {}
+        for event in self.flash_loan_abi:
+            if event.get('type') != 'event':
+                continue
+                
+            inputs = event.get('inputs', [])
+            names = [item.get('name', '').lower() for item in inputs]
+            if 'profit' not in names:
+                continue
+                
+            signature = f"{event['name']}({','.join(item['type'] for item in inputs)})"
+            topic = bytes(Web3.keccak(text=signature))
+            profit_input = inputs[names.index('profit')]
+            
+            if profit_input.get('indexed'):
+                # Indexed values follow the event signature in the topics
+                position = 1 + [item for item in inputs if item.get('indexed')].index(profit_input)
+                decoders[topic] = lambda log, position=position: int.from_bytes(bytes(log['topics'][position]), 'big')
+            else:
+                data_inputs = [item for item in inputs if not item.get('indexed')]
+                types = [item['type'] for item in data_inputs]
+                position = data_inputs.index(profit_input)
+                decoders[topic] = lambda log, types=types, position=position: abi_decode(
+                    types, HexBytes(log['data'])
+                )[position]
+                
+        return decoders
+        
     def setup_flashbots(self):
         """Setup Flashbots integration for MEV protection"""
+        # Relay HTTP session, created lazily inside the event loop
+        self._flashbots_session = None
+        
         try:
-            self.use_flashbots = os.environ.get("USE_FLASHBOTS", "true").lower() == "true"
-            self.flashbots_relay_bsc = os.environ.get(
-                "FLASHBOTS_RELAY_BSC", 
-                "https://bsc-flashbots-relay.ethermine.org"
-            )
-            self.flashbots_relay_polygon = os.environ.get(
-                "FLASHBOTS_RELAY_POLYGON",
-                "https://polygon-flashbots-relay.ethermine.org"
-            )
+            self.use_flashbots = self._config['use_flashbots']
+            self.flashbots_relay_bsc = self._config['flashbots_relay_bsc']
+            self.flashbots_relay_polygon = self._config['flashbots_relay_polygon']
+            
+            # Blocks a bundle is resubmitted for, and whether a relay failure
+            # may expose the transaction in the public mempool
+            self.flashbots_bundle_blocks = self._config['flashbots_bundle_blocks']
+            self.flashbots_public_fallback = self._config['flashbots_public_fallback']
             
             logger.info(f"Flashbots integration {'enabled' if self.use_flashbots else 'disabled'}")
         except Exception as e:
@@ -122,6 +377,12 @@ class ExecutionEngine:
         self.mempool_monitoring = True
         logger.info("Starting mempool monitoring")
         
+        # Workers that fetch and analyze queued transactions
+        workers = [
+            asyncio.create_task(self._mempool_worker())
+            for _ in range(self._mempool_worker_count)
+        ]
+        
         try:
             # Start separate tasks for BSC and Polygon
             bsc_task = asyncio.create_task(self.monitor_mempool(self.web3_bsc, 'BSC'))
@@ -135,50 +396,343 @@ class ExecutionEngine:
                 f"Mempool monitoring failed: {str(e)}", 
                 priority="high"
             )
+        finally:
+            for worker in workers:
+                worker.cancel()
             
     async def monitor_mempool(self, web3_instance, network):
         """
         Monitor mempool for pending transactions on a specific network
         
+        Uses a websocket newPendingTransactions subscription when a websocket
+        URL is configured for the network, and polls a pending filter otherwise.
+        
         Args:
             web3_instance: Web3 instance for the network
             network: Network name (BSC or Polygon)
         """
         logger.info(f"Started mempool monitoring for {network}")
         
-        # Set up a filter for pending transactions
         try:
+            ws_url = self.ws_urls.get(network.upper())
+            if ws_url:
+                await self.monitor_mempool_subscription(web3_instance, network, ws_url)
+                return
+                
             # Create a new filter to get pending transactions
             pending_filter = web3_instance.eth.filter('pending')
             
+            loop = asyncio.get_running_loop()
             while self.mempool_monitoring:
-                # Get new pending transactions
-                pending_tx_hashes = pending_filter.get_new_entries()
-                
-                # Analyze each transaction
-                for tx_hash in pending_tx_hashes:
-                    # Skip if too many transactions to analyze
-                    if len(pending_tx_hashes) > 100:
-                        logger.debug(f"Too many pending transactions ({len(pending_tx_hashes)}), skipping detailed analysis")
-                        break
-                    
-                    try:
-                        # Get transaction details
-                        tx = web3_instance.eth.get_transaction(tx_hash)
-                        
-                        # Check if transaction is DEX-related and has significant value
-                        if await self.is_significant_dex_transaction(tx, web3_instance, network):
-                            await self.handle_significant_transaction(tx, network)
-                    except Exception as e:
-                        logger.debug(f"Error analyzing transaction {tx_hash.hex()}: {str(e)}")
-                
-                # Sleep to avoid overloading the node
-                await asyncio.sleep(1)
+                # Get new pending transactions and hand them to the workers;
+                # a full queue blocks here, pacing the poller to the workers
+                pending_tx_hashes = await loop.run_in_executor(None, pending_filter.get_new_entries)
+                await self.enqueue_pending_transactions(web3_instance, network, pending_tx_hashes)
+                
+                # Poll again immediately while transactions keep arriving,
+                # back off only when the filter was empty
+                if not pending_tx_hashes:
+                    await asyncio.sleep(self._mempool_poll_interval)
                 
         except Exception as e:
             logger.error(f"Error in {network} mempool monitoring: {str(e)}")
             self.mempool_monitoring = False
             
+    async def monitor_mempool_subscription(self, web3_instance, network, ws_url):
+        """
+        Monitor mempool through a websocket newPendingTransactions subscription
+        
+        Args:
+            web3_instance: Web3 instance for the network
+            network: Network name (BSC or Polygon)
+            ws_url: Websocket RPC URL for the network
+        """
+        from web3 import AsyncWeb3, WebSocketProvider
+        
+        async with AsyncWeb3(WebSocketProvider(ws_url)) as ws_web3:
+            await ws_web3.eth.subscribe("newPendingTransactions")
+            logger.info(f"Subscribed to pending transactions on {network}")
+            
+            async for message in ws_web3.socket.process_subscriptions():
+                if not self.mempool_monitoring:
+                    break
+                    
+                await self.enqueue_pending_transactions(web3_instance, network, [message["result"]])
+                
+    async def enqueue_pending_transactions(self, web3_instance, network, tx_hashes: List):
+        """
+        Queue pending transactions for analysis by the mempool workers
+        
+        Args:
+            web3_instance: Web3 instance for the network
+            network: Network name (BSC or Polygon)
+            tx_hashes: Pending transaction hashes
+        """
+        for tx_hash in tx_hashes:
+            # Skip transactions that were already analyzed
+            if not self._mark_seen(network, tx_hash):
+                await self._tx_queue.put((web3_instance, network, tx_hash))
+                
+    async def _mempool_worker(self):
+        """Fetch and analyze queued pending transactions in batches"""
+        while True:
+            # Wait for work, then take whatever else is already queued
+            batch = [await self._tx_queue.get()]
+            while len(batch) < self._mempool_batch_size and not self._tx_queue.empty():
+                batch.append(self._tx_queue.get_nowait())
+                
+            # Group by network so each group is fetched with one request
+            groups = {}
+            for web3_instance, network, tx_hash in batch:
+                groups.setdefault(network, (web3_instance, []))[1].append(tx_hash)
+                
+            for network, (web3_instance, tx_hashes) in groups.items():
+                try:
+                    await self.analyze_pending_transactions(web3_instance, network, tx_hashes)
+                except Exception as e:
+                    logger.debug(f"Error analyzing {network} pending transactions: {str(e)}")
+                    
+            for _ in batch:
+                self._tx_queue.task_done()
+                
+    async def analyze_pending_transactions(self, web3_instance, network, tx_hashes: List):
+        """
+        Fetch and analyze pending transactions
+        
+        Args:
+            web3_instance: Web3 instance for the network
+            network: Network name (BSC or Polygon)
+            tx_hashes: Pending transaction hashes
+        """
+        # Get transaction details in a single batched request
+        transactions = await self._fetch_transactions(web3_instance, tx_hashes)
+        
+        # Analyze the transactions that pass the vectorized pre-filter
+        for tx in self._prefilter_transactions(transactions):
+            try:
+                # Check if transaction is DEX-related and has significant value
+                if await self.is_significant_dex_transaction(tx, web3_instance, network):
+                    await self.handle_significant_transaction(tx, network)
+            except Exception as e:
+                logger.debug(f"Error analyzing transaction: {str(e)}")
+                
+    def _prefilter_transactions(self, transactions: List) -> List:
+        """
+        Select the transactions that may be significant DEX transactions
+        
+        Compares the value, selector and 'to' address of the whole batch at
+        once. The result is a superset of what is_significant_dex_transaction
+        accepts, which still makes the exact decision.
+        
+        Args:
+            transactions: Fetched transaction objects
+            
+        Returns:
+            Candidate transactions
+        """
+        transactions = [tx for tx in transactions if tx and tx.get('to') and tx.get('input')]
+        if not transactions:
+            return []
+            
+        count = len(transactions)
+        
+        # Values exceed uint64, so compare them as floats; rounding is
+        # monotonic, so no transaction above the threshold is rejected
+        values = np.fromiter((tx.get('value', 0) for tx in transactions), dtype=np.float64, count=count)
+        value_mask = values >= float(self._min_tx_wei)
+        
+        # Decode all selectors and addresses with one fromhex call each;
+        # inputs shorter than a selector decode to zero
+        selector_hex = ''.join(
+            (tx['input'][2:10] if isinstance(tx['input'], str) else tx['input'][:4].hex()).ljust(8, '0')
+            for tx in transactions
+        )
+        selectors = np.frombuffer(bytes.fromhex(selector_hex), dtype='>u4')
+        
+        mask = np.isin(selectors, self._sel_np)
+        if len(self._dex_np):
+            to_hex = ''.join(tx['to'][2:] for tx in transactions)
+            to_arr = np.frombuffer(bytes.fromhex(to_hex), dtype=np.uint8).reshape(-1, 20)
+            mask |= (to_arr[:, None, :] == self._dex_np[None, :, :]).all(axis=2).any(axis=1)
+        mask &= value_mask
+        
+        return [transactions[i] for i in np.flatnonzero(mask)]
+        
+    async def _fetch_transactions(self, web3_instance, tx_hashes: List) -> List:
+        """
+        Fetch pending transactions with one batched JSON-RPC request
+        
+        Falls back to one request per hash if the batch fails, for example
+        when a transaction leaves the mempool before it is fetched.
+        
+        Args:
+            web3_instance: Web3 instance for the network
+            tx_hashes: Transaction hashes to fetch
+            
+        Returns:
+            List of transactions that could be fetched
+        """
+        def _fetch():
+            try:
+                with web3_instance.batch_requests() as batch:
+                    for tx_hash in tx_hashes:
+                        batch.add(web3_instance.eth.get_transaction(tx_hash))
+                    return [tx for tx in batch.execute() if tx]
+            except Exception as e:
+                logger.debug(f"Batched transaction fetch failed, fetching individually: {str(e)}")
+                
+            transactions = []
+            for tx_hash in tx_hashes:
+                try:
+                    transactions.append(web3_instance.eth.get_transaction(tx_hash))
+                except Exception as e:
+                    logger.debug(f"Error fetching transaction {tx_hash.hex()}: {str(e)}")
+            return transactions
+            
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, _fetch)
+        
+    def _mark_seen(self, network: str, tx_hash) -> bool:
+        """
+        Record a transaction hash as analyzed
+        
+        Args:
+            network: Network name
+            tx_hash: Transaction hash
+            
+        Returns:
+            True if the hash was already seen, False otherwise
+        """
+        seen = self._seen_tx.get(network)
+        if seen is None:
+            seen = self._seen_tx[network] = SeenRing(self._seen_tx_capacity)
+            
+        return seen.add(tx_hash)
+        
+    async def _get_gas_price(self, network: str, web3) -> int:
+        """
+        Get the network gas price, cached for a short TTL and read off the event loop
+        
+        Args:
+            network: Network name
+            web3: Web3 instance for the network
+            
+        Returns:
+            Gas price in wei
+        """
+        now = time.monotonic()
+        cached = self._gas_price_cache.get(network)
+        if cached and now - cached[0] < self._gas_price_ttl:
+            return cached[1]
+            
+        loop = asyncio.get_running_loop()
+        gas_price = await loop.run_in_executor(None, lambda: web3.eth.gas_price)
+        self._gas_price_cache[network] = (now, gas_price)
+        return gas_price
+        
+    async def _next_nonce(self, network: str, web3, wallet_address: str) -> int:
+        """
+        Reserve the next nonce for the trading wallet
+        
+        The nonce is seeded from the pending transaction count on first use
+        and after a resync, and tracked locally otherwise. The caller must
+        pass it to _settle_nonce once sent, or to _release_nonce or
+        _reset_nonce if it was not.
+        
+        Args:
+            network: Network name
+            web3: Web3 instance for the network
+            wallet_address: Wallet address
+            
+        Returns:
+            Nonce for the next transaction
+        """
+        lock = self._nonce_locks.setdefault(network, asyncio.Lock())
+        async with lock:
+            if network not in self._nonces:
+                loop = asyncio.get_running_loop()
+                self._nonces[network] = await loop.run_in_executor(
+                    None, web3.eth.get_transaction_count, wallet_address, 'pending'
+                )
+                
+            nonce = self._nonces[network]
+            self._nonces[network] = nonce + 1
+            self._reserved_nonces.setdefault(network, set()).add(nonce)
+            return nonce
+            
+    def _settle_nonce(self, network: str, nonce: int):
+        """
+        Mark a reserved nonce as sent
+        
+        Args:
+            network: Network name
+            nonce: Reserved nonce
+        """
+        self._reserved_nonces.get(network, set()).discard(nonce)
+        self._resync_nonce_if_idle(network)
+        
+    def _release_nonce(self, network: str, nonce: int):
+        """
+        Return a reserved nonce that was never sent
+        
+        The nonce is handed out again if it was the most recent reservation;
+        otherwise the sequence has a gap and is re-read from the node once no
+        other reserved nonce is in flight.
+        
+        Args:
+            network: Network name
+            nonce: Reserved nonce
+        """
+        self._reserved_nonces.get(network, set()).discard(nonce)
+        if self._nonces.get(network) == nonce + 1:
+            self._nonces[network] = nonce
+        else:
+            self._nonce_resync.add(network)
+        self._resync_nonce_if_idle(network)
+        
+    def _reset_nonce(self, network: str, nonce: Optional[int] = None):
+        """
+        Re-read the nonce from the node once no reserved nonce is in flight,
+        e.g. after a failed send left the local count out of sync
+        
+        Args:
+            network: Network name
+            nonce: Reserved nonce of the failed transaction, if still reserved
+        """
+        if nonce is not None:
+            self._reserved_nonces.get(network, set()).discard(nonce)
+        self._nonce_resync.add(network)
+        self._resync_nonce_if_idle(network)
+        
+    def _resync_nonce_if_idle(self, network: str):
+        """
+        Drop the locally tracked nonce if a resync is due and no reserved
+        nonce is in flight
+        
+        Args:
+            network: Network name
+        """
+        if network in self._nonce_resync and not self._reserved_nonces.get(network):
+            self._nonce_resync.discard(network)
+            self._nonces.pop(network, None)
+        
+    async def _get_chain_id(self, network: str, web3) -> int:
+        """
+        Get the chain ID for a network, reading it from the node only once and off the event loop
+        
+        Args:
+            network: Network name
+            web3: Web3 instance for the network
+            
+        Returns:
+            Chain ID
+        """
+        chain_id = self._chain_ids.get(network)
+        if chain_id is None:
+            loop = asyncio.get_running_loop()
+            chain_id = self._chain_ids[network] = await loop.run_in_executor(None, lambda: web3.eth.chain_id)
+        return chain_id
+        
     async def is_significant_dex_transaction(self, tx, web3_instance, network):
         """
         Determine if a transaction is a significant DEX transaction
@@ -194,38 +748,28 @@ class ExecutionEngine:
         if not tx or not tx.get('to') or not tx.get('input'):
             return False
             
-        # Check transaction value
-        min_tx_value = float(os.environ.get("MIN_SIGNIFICANT_TX_VALUE_ETH", "1.0"))
-        tx_value_eth = web3_instance.fromWei(tx.get('value', 0), 'ether')
-        
-        # Known DEX contract addresses
-        dex_addresses = [addr.lower() for addr in json.loads(os.environ.get("DEX_ADDRESSES", "[]"))]
-        
-        # Check if transaction is interacting with a DEX
-        is_dex_tx = tx['to'].lower() in dex_addresses
-        
-        # Check function signatures for common DEX methods
-        # Common function signatures for swaps (first 4 bytes of keccak hash)
-        swap_signatures = [
-            "0x38ed1739",  # swapExactTokensForTokens
-            "0x8803dbee",  # swapTokensForExactTokens
-            "0x7ff36ab5",  # swapExactETHForTokens
-            "0x4a25d94a",  # swapTokensForExactETH
-            "0x18cbafe5",  # swapExactTokensForETH
-            "0xfb3bdb41",  # swapETHForExactTokens
-            "0x5c11d795"   # swap
-        ]
-        
-        input_data = tx.get('input', '0x')
-        function_signature = input_data[:10]  # First 10 chars (including 0x)
-        is_swap_tx = function_signature in swap_signatures
-        
-        # Check if transaction is significant
-        is_significant = (is_dex_tx or is_swap_tx) and tx_value_eth >= min_tx_value
+        # Most pending transactions are small, so reject on value first
+        tx_value = tx.get('value', 0)
+        if tx_value < self._min_tx_wei:
+            return False
+            
+        # Check the 4-byte selector for common DEX methods as an integer,
+        # whether the input is a hex string or raw bytes
+        input_data = tx['input']
+        if isinstance(input_data, str):
+            selector = int(input_data[2:10], 16) if len(input_data) >= 10 else None
+        else:
+            selector = int.from_bytes(input_data[:4], 'big') if len(input_data) >= 4 else None
+            
+        # Then whether the transaction is interacting with a known DEX
+        is_significant = (
+            selector in self._swap_selectors_int or
+            tx['to'] in self._dex_addresses
+        )
         
         if is_significant:
             logger.info(f"Detected significant DEX transaction: {tx['hash'].hex()}, "
-                       f"Value: {tx_value_eth} ETH, Network: {network}")
+                       f"Value: {Web3.fromWei(tx_value, 'ether')} ETH, Network: {network}")
         
         return is_significant
         
@@ -245,15 +789,15 @@ class ExecutionEngine:
             from_addr = tx.get('from', 'Unknown')
             to_addr = tx.get('to', 'Unknown')
             
-            web3 = self.web3_bsc if network == 'BSC' else self.web3_polygon
-            value_eth = web3.fromWei(tx.get('value', 0), 'ether')
+            value_wei = tx.get('value', 0)
+            value_eth = Web3.fromWei(value_wei, 'ether')
             
             logger.info(f"Significant DEX transaction detected: {tx_hash}")
             logger.info(f"From: {from_addr}, To: {to_addr}")
             logger.info(f"Value: {value_eth} ETH, Network: {network}")
             
             # Alert on very large transactions
-            if value_eth > float(os.environ.get("LARGE_TX_ALERT_THRESHOLD_ETH", "10.0")):
+            if value_wei > self._large_tx_alert_wei:
                 await self.notification_service.send_alert(
                     f"Large DEX transaction detected!\n"
                     f"Hash: {tx_hash}\n"
@@ -296,12 +840,9 @@ class ExecutionEngine:
                 
             token_a, token_b = tokens
             
-            # Get token addresses from config or environment
-            token_addresses = json.loads(os.environ.get("TOKEN_ADDRESSES", "{}"))
-            
             # Get token addresses
-            token_a_address = token_addresses.get(f"{token_a}_{network}")
-            token_b_address = token_addresses.get(f"{token_b}_{network}")
+            token_a_address = self._token_addresses.get((token_a, network))
+            token_b_address = self._token_addresses.get((token_b, network))
             
             if not token_a_address or not token_b_address:
                 return {
@@ -312,44 +853,40 @@ class ExecutionEngine:
             # Select Web3 instance and contract
             if network.upper() == 'BSC':
                 web3 = self.web3_bsc
-                contract_address = self.flash_loan_contracts.get('BSC')
             elif network.upper() == 'POLYGON':
                 web3 = self.web3_polygon
-                contract_address = self.flash_loan_contracts.get('POLYGON')
             else:
                 return {
                     'success': False,
                     'error': f"Unsupported network: {network}",
                 }
                 
-            if not contract_address:
+            contract = self._contracts.get(network.upper())
+            if not contract:
                 return {
                     'success': False,
                     'error': f"Flash loan contract not configured for {network}",
                 }
                 
-            # Create contract instance
-            contract = web3.eth.contract(
-                address=Web3.toChecksumAddress(contract_address),
-                abi=self.flash_loan_abi
-            )
-            
             # Convert amount to wei (assuming 18 decimals)
             amount_wei = web3.toWei(amount, 'ether')
             
             # Prepare transaction
-            wallet_address = Account.from_key(self.private_key).address
+            wallet_address = self._wallet_address
+            call_data = self._flash_loan_selector + abi_encode(
+                self._flash_loan_types,
+                [token_a_address, token_b_address, amount_wei, source_dex, target_dex]
+            )
             
-            # Estimate gas
+            # Estimate gas off the event loop
+            loop = asyncio.get_running_loop()
             gas_estimate = None
             try:
-                gas_estimate = contract.functions.executeFlashloan(
-                    Web3.toChecksumAddress(token_a_address),
-                    Web3.toChecksumAddress(token_b_address),
-                    amount_wei,
-                    source_dex,
-                    target_dex
-                ).estimateGas({'from': wallet_address})
+                gas_estimate = await loop.run_in_executor(None, web3.eth.estimate_gas, {
+                    'from': wallet_address,
+                    'to': contract.address,
+                    'data': call_data
+                })
                 
                 # Add 20% buffer to gas estimate
                 gas_estimate = int(gas_estimate * 1.2)
@@ -358,24 +895,20 @@ class ExecutionEngine:
                 gas_estimate = 5000000  # Default gas limit
                 
             # Get current gas price
-            gas_price = web3.eth.gas_price
+            gas_price = await self._get_gas_price(network.upper(), web3)
             # Add 10% to ensure quick confirmation
             gas_price = int(gas_price * 1.1)
             
             # Check if we're using Flashbots
             if self.use_flashbots:
                 return await self.execute_via_flashbots(
-                    web3, contract, wallet_address,
-                    token_a_address, token_b_address,
-                    amount_wei, source_dex, target_dex,
+                    web3, contract, wallet_address, call_data,
                     gas_estimate, gas_price, network
                 )
             else:
                 return await self.execute_normal_transaction(
-                    web3, contract, wallet_address,
-                    token_a_address, token_b_address,
-                    amount_wei, source_dex, target_dex,
-                    gas_estimate, gas_price
+                    web3, contract, wallet_address, call_data,
+                    gas_estimate, gas_price, network
                 )
                 
         except Exception as e:
@@ -386,10 +919,8 @@ class ExecutionEngine:
             }
             
     async def execute_normal_transaction(
-        self, web3, contract, wallet_address,
-        token_a_address, token_b_address,
-        amount_wei, source_dex, target_dex,
-        gas_estimate, gas_price
+        self, web3, contract, wallet_address, call_data,
+        gas_estimate, gas_price, network
     ):
         """
         Execute a normal (non-Flashbots) transaction
@@ -398,109 +929,177 @@ class ExecutionEngine:
             web3: Web3 instance
             contract: Contract instance
             wallet_address: Wallet address
-            token_a_address: First token address
-            token_b_address: Second token address
-            amount_wei: Loan amount in wei
-            source_dex: Source DEX name
-            target_dex: Target DEX name
+            call_data: Encoded executeFlashloan calldata
             gas_estimate: Gas estimate
             gas_price: Gas price
+            network: Network name
             
         Returns:
             Dictionary with execution results
         """
+        try:
+            signed_tx, nonce = await self._sign_flash_loan_transaction(
+                web3, contract, wallet_address, call_data,
+                gas_estimate, gas_price, network
+            )
+            
+            # Send transaction off the event loop
+            try:
+                tx_hash = await self._send_raw_transaction(web3, signed_tx)
+            except BaseException as e:
+                # The reserved nonce was not used or was out of sync with the
+                # node ("nonce too low"), re-read it for the next trade
+                logger.warning(f"Transaction send failed on {network}, resyncing nonce: {str(e)}")
+                self._reset_nonce(network.upper(), nonce)
+                raise
+            self._settle_nonce(network.upper(), nonce)
+                
+            return await self._wait_for_result(web3, tx_hash, gas_price, network)
+                
+        except Exception as e:
+            logger.error(f"Error in normal transaction execution: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e),
+            }
+            
+    @staticmethod
+    async def _send_raw_transaction(web3, signed_tx):
+        """
+        Broadcast a signed transaction without blocking the event loop
+        
+        Args:
+            web3: Web3 instance
+            signed_tx: Signed transaction
+            
+        Returns:
+            Transaction hash
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, web3.eth.send_raw_transaction, signed_tx.rawTransaction)
+        
+    async def _sign_flash_loan_transaction(
+        self, web3, contract, wallet_address, call_data,
+        gas_estimate, gas_price, network
+    ):
+        """
+        Build and sign a flash loan transaction
+        
+        Args:
+            web3: Web3 instance
+            contract: Contract instance
+            wallet_address: Wallet address
+            call_data: Encoded executeFlashloan calldata
+            gas_estimate: Gas estimate
+            gas_price: Gas price
+            network: Network name
+            
+        Returns:
+            Tuple of (signed transaction, nonce used)
+        """
+        # Resolve the chain ID before reserving a nonce so a failed lookup
+        # cannot leave a gap in the nonce sequence
+        chain_id = await self._get_chain_id(network.upper(), web3)
+        nonce = await self._next_nonce(network.upper(), web3, wallet_address)
+        
         try:
             # Build transaction
-            transaction = contract.functions.executeFlashloan(
-                Web3.toChecksumAddress(token_a_address),
-                Web3.toChecksumAddress(token_b_address),
-                amount_wei,
-                source_dex,
-                target_dex
-            ).buildTransaction({
+            transaction = {
                 'from': wallet_address,
+                'to': contract.address,
+                'data': call_data,
+                'value': 0,
                 'gas': gas_estimate,
                 'gasPrice': gas_price,
-                'nonce': web3.eth.get_transaction_count(wallet_address),
-            })
+                'nonce': nonce,
+                'chainId': chain_id,
+            }
+            
+            # Sign transaction off the event loop
+            loop = asyncio.get_running_loop()
+            signed_tx = await loop.run_in_executor(None, self._account.sign_transaction, transaction)
+            return signed_tx, nonce
+            
+        except BaseException:
+            # The reserved nonce will never be sent (including on cancellation)
+            self._release_nonce(network.upper(), nonce)
+            raise
+        
+    async def _wait_for_result(self, web3, tx_hash, gas_price, network) -> Dict:
+        """
+        Wait for a sent transaction to be mined and summarize the outcome
+        
+        Args:
+            web3: Web3 instance
+            tx_hash: Transaction hash
+            gas_price: Gas price
+            network: Network name
             
-            # Sign transaction
-            signed_tx = web3.eth.account.sign_transaction(transaction, self.private_key)
+        Returns:
+            Dictionary with execution results
+        """
+        # Wait for transaction receipt without blocking the event loop
+        loop = asyncio.get_running_loop()
+        try:
+            receipt = await loop.run_in_executor(
+                None,
+                lambda: web3.eth.wait_for_transaction_receipt(tx_hash, timeout=60, poll_latency=0.25)
+            )
+        except TimeExhausted:
+            # The transaction may never be mined, re-read the nonce next time
+            self._reset_nonce(network.upper())
+            return {
+                'success': False,
+                'error': "Transaction not confirmed after 60 seconds",
+                'tx_hash': tx_hash.hex()
+            }
             
-            # Send transaction
-            tx_hash = web3.eth.send_raw_transaction(signed_tx.rawTransaction)
+        # Check transaction status
+        if receipt['status'] == 1:
+            # Transaction successful
+            # Parse logs to extract profit (implementation depends on contract events)
+            profit_wei = self.extract_profit_from_logs(receipt)
+            profit_eth = web3.fromWei(profit_wei, 'ether')
+            
+            # Convert ETH to USD (simplified)
+            eth_price_usd = 3000  # This should come from a price feed
+            profit_usd = profit_eth * eth_price_usd
             
-            # Wait for transaction receipt
-            receipt = None
-            for i in range(30):  # Wait up to 30 * 2 seconds
-                try:
-                    receipt = web3.eth.get_transaction_receipt(tx_hash)
-                    if receipt is not None:
-                        break
-                except Exception:
-                    pass
-                await asyncio.sleep(2)
-                
-            if receipt is None:
-                return {
-                    'success': False,
-                    'error': "Transaction not confirmed after 60 seconds",
-                    'tx_hash': tx_hash.hex()
-                }
-                
-            # Check transaction status
-            if receipt['status'] == 1:
-                # Transaction successful
-                # Parse logs to extract profit (implementation depends on contract events)
-                profit_wei = self.extract_profit_from_logs(receipt)
-                profit_eth = web3.fromWei(profit_wei, 'ether')
-                
-                # Convert ETH to USD (simplified)
-                eth_price_usd = 3000  # This should come from a price feed
-                profit_usd = profit_eth * eth_price_usd
-                
-                return {
-                    'success': True,
-                    'tx_hash': tx_hash.hex(),
-                    'profit_wei': profit_wei,
-                    'profit_eth': profit_eth,
-                    'profit_usd': profit_usd,
-                    'gas_used': receipt['gasUsed'],
-                    'gas_cost_wei': receipt['gasUsed'] * gas_price,
-                }
-            else:
-                return {
-                    'success': False,
-                    'error': "Transaction reverted",
-                    'tx_hash': tx_hash.hex(),
-                    'gas_used': receipt['gasUsed'],
-                }
-                
-        except Exception as e:
-            logger.error(f"Error in normal transaction execution: {str(e)}")
+            return {
+                'success': True,
+                'tx_hash': tx_hash.hex(),
+                'profit_wei': profit_wei,
+                'profit_eth': profit_eth,
+                'profit_usd': profit_usd,
+                'gas_used': receipt['gasUsed'],
+                'gas_cost_wei': receipt['gasUsed'] * gas_price,
+            }
+        else:
             return {
                 'success': False,
-                'error': str(e),
+                'error': "Transaction reverted",
+                'tx_hash': tx_hash.hex(),
+                'gas_used': receipt['gasUsed'],
             }
             
     async def execute_via_flashbots(
-        self, web3, contract, wallet_address,
-        token_a_address, token_b_address,
-        amount_wei, source_dex, target_dex,
+        self, web3, contract, wallet_address, call_data,
         gas_estimate, gas_price, network
     ):
         """
         Execute a transaction via Flashbots to prevent front-running
         
+        The signed transaction is submitted as a single-transaction bundle
+        for the next block, and resubmitted for each following block until
+        it is included, its nonce is used by another transaction, or
+        flashbots_bundle_blocks blocks have passed. If the relay fails, the
+        transaction is only sent publicly when flashbots_public_fallback is set.
+        
         Args:
             web3: Web3 instance
             contract: Contract instance
             wallet_address: Wallet address
-            token_a_address: First token address
-            token_b_address: Second token address
-            amount_wei: Loan amount in wei
-            source_dex: Source DEX name
-            target_dex: Target DEX name
+            call_data: Encoded executeFlashloan calldata
             gas_estimate: Gas estimate
             gas_price: Gas price
             network: Network name
@@ -508,19 +1107,53 @@ class ExecutionEngine:
         Returns:
             Dictionary with execution results
         """
-        # This is a simplified implementation as full Flashbots integration requires
-        # additional setup and dependencies
         logger.info("Executing transaction via Flashbots")
         
         try:
-            # For now, fallback to regular transaction
-            # In a real implementation, this would use Flashbots Provider
-            return await self.execute_normal_transaction(
-                web3, contract, wallet_address,
-                token_a_address, token_b_address,
-                amount_wei, source_dex, target_dex,
-                gas_estimate, gas_price
+            signed_tx, nonce = await self._sign_flash_loan_transaction(
+                web3, contract, wallet_address, call_data,
+                gas_estimate, gas_price, network
             )
+            
+            relay_url = (
+                self.flashbots_relay_bsc if network.upper() == 'BSC'
+                else self.flashbots_relay_polygon
+            )
+            
+            try:
+                included = await self._submit_bundle_until_included(
+                    web3, relay_url, signed_tx, wallet_address, nonce
+                )
+            except asyncio.CancelledError:
+                # A bundle may still land, re-read the nonce once idle
+                self._reset_nonce(network.upper(), nonce)
+                raise
+            except Exception as e:
+                if not self.flashbots_public_fallback:
+                    self._reset_nonce(network.upper(), nonce)
+                    raise RuntimeError(f"Flashbots relay failed on {network}: {str(e)}")
+                    
+                logger.warning(f"Flashbots relay failed on {network}, sending publicly: {str(e)}")
+                try:
+                    tx_hash = await self._send_raw_transaction(web3, signed_tx)
+                except BaseException:
+                    self._reset_nonce(network.upper(), nonce)
+                    raise
+                self._settle_nonce(network.upper(), nonce)
+                return await self._wait_for_result(web3, tx_hash, gas_price, network)
+                
+            if not included:
+                # The nonce was never used by this transaction
+                self._release_nonce(network.upper(), nonce)
+                return {
+                    'success': False,
+                    'error': f"Bundle not included within {self.flashbots_bundle_blocks} blocks",
+                    'tx_hash': signed_tx.hash.hex()
+                }
+                
+            self._settle_nonce(network.upper(), nonce)
+            return await self._wait_for_result(web3, signed_tx.hash, gas_price, network)
+            
         except Exception as e:
             logger.error(f"Error in Flashbots execution: {str(e)}")
             return {
@@ -528,6 +1161,108 @@ class ExecutionEngine:
                 'error': f"Flashbots execution failed: {str(e)}",
             }
             
+    async def _submit_bundle_until_included(self, web3, relay_url: str, signed_tx, wallet_address: str, nonce: int) -> bool:
+        """
+        Submit a transaction bundle for successive blocks until it is included
+        
+        Args:
+            web3: Web3 instance
+            relay_url: Relay endpoint URL
+            signed_tx: Signed transaction
+            wallet_address: Wallet address
+            nonce: Nonce of the signed transaction
+            
+        Returns:
+            True if the transaction was mined, False if it was not included in
+            time or its nonce was taken by another transaction
+        """
+        loop = asyncio.get_running_loop()
+        get_block_number = lambda: web3.eth.block_number
+        
+        for _ in range(self.flashbots_bundle_blocks):
+            target_block = await loop.run_in_executor(None, get_block_number) + 1
+            await self._send_bundle(relay_url, [signed_tx.rawTransaction], target_block)
+            
+            # Wait for the target block, then check whether the bundle landed
+            while await loop.run_in_executor(None, get_block_number) < target_block:
+                await asyncio.sleep(0.5)
+                
+            if await loop.run_in_executor(None, self._get_receipt, web3, signed_tx.hash) is not None:
+                return True
+                
+            mined_nonce = await loop.run_in_executor(None, web3.eth.get_transaction_count, wallet_address, 'latest')
+            if mined_nonce > nonce:
+                logger.warning(f"Nonce {nonce} was used by another transaction, dropping bundle")
+                return False
+                
+        return False
+        
+    @staticmethod
+    def _get_receipt(web3, tx_hash):
+        """Get a transaction receipt, or None if the transaction is not mined"""
+        try:
+            return web3.eth.get_transaction_receipt(tx_hash)
+        except TransactionNotFound:
+            return None
+            
+    async def _send_bundle(self, relay_url: str, raw_transactions: List, target_block: int) -> Dict:
+        """
+        Submit a bundle of signed transactions to a Flashbots-style relay
+        
+        Args:
+            relay_url: Relay endpoint URL
+            raw_transactions: Signed raw transactions
+            target_block: Block number the bundle targets
+            
+        Returns:
+            Relay JSON-RPC result
+        """
+        body = json.dumps({
+            'jsonrpc': '2.0',
+            'id': 1,
+            'method': 'eth_sendBundle',
+            'params': [{
+                'txs': [Web3.toHex(raw_tx) for raw_tx in raw_transactions],
+                'blockNumber': hex(target_block)
+            }]
+        })
+        
+        # Relays authenticate bundles with a signature over the body hash
+        message = encode_defunct(text=Web3.toHex(Web3.keccak(text=body)))
+        signature = Web3.toHex(self._account.sign_message(message).signature)
+        headers = {
+            'Content-Type': 'application/json',
+            'X-Flashbots-Signature': f"{self._wallet_address}:{signature}"
+        }
+        
+        session = self._get_flashbots_session()
+        async with session.post(relay_url, data=body, headers=headers) as response:
+            result = await response.json(content_type=None)
+            
+        if response.status != 200 or 'error' in result:
+            raise RuntimeError(f"Relay rejected bundle: {result.get('error', response.status)}")
+            
+        return result.get('result')
+        
+    def _get_flashbots_session(self) -> aiohttp.ClientSession:
+        """
+        Get the keep-alive HTTP session shared by all relay submissions
+        
+        Returns:
+            aiohttp session, created on first use inside the event loop
+        """
+        if self._flashbots_session is None or self._flashbots_session.closed:
+            self._flashbots_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=16, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=2.0)
+            )
+        return self._flashbots_session
+        
+    async def close(self):
+        """Close network resources held by the engine"""
+        if self._flashbots_session is not None and not self._flashbots_session.closed:
+            await self._flashbots_session.close()
+            
     def extract_profit_from_logs(self, receipt):
         """
         Extract profit from transaction logs
@@ -538,16 +1273,15 @@ class ExecutionEngine:
         Returns:
             Profit amount in wei
         """
-        # This is a simplified implementation
-        # In a real implementation, this would parse event logs based on contract ABI
-        
-        # Default to 0 profit if we can't parse logs
+        # Default to 0 profit if the contract ABI has no profit events
         profit_wei = 0
         
-        # TODO: Implement log parsing based on your contract's event structure
-        # Example:
-        # for log in receipt['logs']:
-        #     if log['topics'][0].hex() == '0xProfit_Event_Topic_Hash':
-        #         profit_wei = int(log['data'], 16)
-        
+        for log in receipt['logs']:
+            if not log['topics']:
+                continue
+                
+            decoder = self._profit_topics.get(bytes(log['topics'][0]))
+            if decoder:
+                profit_wei += decoder(log)
+                
         return profit_wei
@@ -3,10 +3,124 @@ import asyncio
 import time
 from typing import Dict, List, Optional, Tuple, Any
 import os
+import bisect
+import heapq
+import numpy as np
 from web3 import Web3
 
 logger = logging.getLogger(__name__)
 
+# DEX fee rates (typical values)
+DEX_FEE_RATES = {
+    'PANCAKESWAP': 0.0025,  # 0.25%
+    'SUSHISWAP': 0.003,     # 0.3%
+    'UNISWAP': 0.003,       # 0.3%
+    'QUICKSWAP': 0.003,     # 0.3%
+    'APESWAP': 0.003,       # 0.3%
+    '1INCH': 0.003,         # Variable, using 0.3% as estimate
+    'DODO': 0.001,          # 0.1%
+    'CURVE': 0.0004,        # 0.04% (varies by pool)
+    'BALANCER': 0.002,      # 0.2% (varies by pool)
+    'KYBERSWAP': 0.003      # 0.3%
+}
+DEFAULT_DEX_FEE_RATE = 0.003
+
+# Flash loan fee rates by provider:
+# - Aave: 0.09%
+# - DyDx: 0% (gas only)
+# - DODO: 0.1%
+# - Uniswap V3 Flash Swaps: ~0.05% (varies)
+FLASH_LOAN_FEE_RATES = {
+    'AAVE': 0.0009,
+    'DYDX': 0.0,
+    'DODO': 0.001,
+    'UNISWAP_V3': 0.0005
+}
+DEFAULT_FLASH_LOAN_FEE_RATE = 0.001
+
+# Gas costs vary by network and congestion; these are rough estimates of
+# (gas units, gas price in Gwei, native token price in USD)
+NETWORK_GAS_ESTIMATES = {
+    'BSC': (500000, 5, 300),      # Complex flash loan on BSC, typically 5 Gwei, BNB price
+    'POLYGON': (800000, 30, 1)    # Complex flash loan on Polygon, 30+ Gwei, MATIC price
+}
+DEFAULT_GAS_COST_USD = 10.0
+
+# Upper-triangle (source, target) index pairs, built at import for the DEX
+# counts seen per token pair so the first scan does not pay for them
+PRECOMPUTED_PAIR_INDICES = 16
+_pair_indices_cache = {n: np.triu_indices(n, 1) for n in range(PRECOMPUTED_PAIR_INDICES + 1)}
+
+
+def pair_indices(n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get the index arrays of every unordered pair among n DEX quotes
+    
+    Args:
+        n: Number of DEX quotes
+        
+    Returns:
+        Tuple of (source index, target index) arrays
+    """
+    indices = _pair_indices_cache.get(n)
+    if indices is None:
+        indices = _pair_indices_cache[n] = np.triu_indices(n, 1)
+    return indices
+
+
+def compute_net_profits(price: np.ndarray, liquidity: np.ndarray, dex_fee_rate: np.ndarray,
+                        gas_cost: np.ndarray, flash_fee_rate: float,
+                        min_loan: float, max_loan: float) -> Tuple[np.ndarray, ...]:
+    """
+    Estimate the net profit of every unordered pair of DEX quotes
+    
+    Args:
+        price: Token price per DEX
+        liquidity: Liquidity in USD per DEX (inf if unknown, 0 to size at min_loan)
+        dex_fee_rate: Trading fee rate per DEX
+        gas_cost: Gas cost in USD per DEX network
+        flash_fee_rate: Flash loan fee rate
+        min_loan: Minimum loan amount in USD
+        max_loan: Maximum loan amount in USD
+        
+    Returns:
+        Tuple of (buy index, sell index, buy price, sell price, price difference
+        percentage, loan amount in USD, net profit in USD) arrays, one entry
+        per DEX pair
+    """
+    # Every unordered DEX pair, skipping non-positive prices
+    source, target = pair_indices(len(price))
+    valid = (price[source] > 0) & (price[target] > 0)
+    source, target = source[valid], target[valid]
+    source_price, target_price = price[source], price[target]
+    
+    # Determine direction (buy at lower, sell at higher) without branching
+    source_is_buy = source_price < target_price
+    buy = np.where(source_is_buy, source, target)
+    sell = np.where(source_is_buy, target, source)
+    buy_price = np.where(source_is_buy, source_price, target_price)
+    sell_price = np.where(source_is_buy, target_price, source_price)
+    
+    # Calculate price difference percentage relative to the buy price
+    price_diff_pct = (sell_price / buy_price - 1.0) * 100.0
+    
+    # Loan amount: 1% of the smallest liquidity pool within the configured limits
+    loan_amount = np.maximum(
+        min_loan,
+        np.minimum(np.minimum(liquidity[buy], liquidity[sell]) * 0.01, max_loan)
+    )
+    
+    # Net profit after flash loan fee, DEX fees and gas, accumulated in place
+    # in a single buffer: loan * (spread - flash fee - DEX fees) - gas
+    net_profit = np.multiply(price_diff_pct, 0.01)
+    net_profit -= flash_fee_rate
+    net_profit -= dex_fee_rate[buy]
+    net_profit -= dex_fee_rate[sell]
+    net_profit *= loan_amount
+    net_profit -= gas_cost[buy]
+    
+    return buy, sell, buy_price, sell_price, price_diff_pct, loan_amount, net_profit
+
 class FlashLoanOrchestrator:
     """
     Orchestrates the flash loan process by coordinating price aggregation,
@@ -36,7 +150,109 @@ class FlashLoanOrchestrator:
         self.minimum_profit_threshold = float(os.environ.get("MIN_PROFIT_THRESHOLD_USD", "10.0"))
         self.execution_interval = int(os.environ.get("EXECUTION_INTERVAL_MS", "500"))
         self.max_concurrent_executions = int(os.environ.get("MAX_CONCURRENT_EXECUTIONS", "3"))
-        self.execution_semaphore = asyncio.Semaphore(self.max_concurrent_executions)
+        self.min_loan_amount = float(os.environ.get("MIN_LOAN_AMOUNT_USD", "1000"))
+        self.max_loan_amount = float(os.environ.get("MAX_LOAN_AMOUNT_USD", "50000"))
+        self.confidence_threshold = float(os.environ.get("AI_CONFIDENCE_THRESHOLD", "0.6"))
+        
+        # Opportunities waiting for one of the execution workers, kept sorted by
+        # (profit, -sequence) so workers take the most profitable from the end.
+        # When full, a new opportunity replaces the least profitable one if it
+        # beats it, and opportunities older than one price tick are discarded
+        self.exec_queue_size = self.max_concurrent_executions * 5
+        self.opportunity_max_age = getattr(price_aggregator, 'update_interval_s', 1.0)
+        self._exec_queue: List[Tuple[float, int, float, Dict]] = []
+        self._exec_available = asyncio.Semaphore(0)
+        self._exec_sequence = 0
+        
+        # Alerts sent by a background worker so executions never wait on them
+        self._notify_queue = asyncio.Queue()
+        
+        # Token pairs refreshed by the price aggregator
+        self._price_queue = self.price_aggregator.subscribe()
+        
+        # Token pairs interned to stable integer ids
+        self._pair_id: Dict[str, int] = {}
+        self._pair_names: List[str] = []
+        
+        # Per token pair: DEX quotes sorted by price, and the current quote per DEX
+        self._pair_state: Dict[str, List[Tuple]] = {}
+        self._pair_entries: Dict[str, Dict[Tuple, Tuple]] = {}
+        self.pair_candidates = 3  # cheapest and most expensive quotes scanned per pair
+        
+        # Fee and gas lookup tables indexed by integer DEX and network ids
+        self._dex_name_to_id: Dict[str, int] = {}
+        self._dex_fee_rates = np.empty(0, dtype=np.float64)
+        for dex_name in DEX_FEE_RATES:
+            self._dex_id(dex_name)
+            
+        self._network_to_id: Dict[str, int] = {}
+        self._gas_costs = np.empty(0, dtype=np.float64)
+        for network in NETWORK_GAS_ESTIMATES:
+            self._network_id(network)
+            
+        # Per-scan input arrays, reused across ticks and grown on demand
+        self._scan_size = 0
+        self._resize_scan_buffers(2 * self.pair_candidates)
+        
+        self._flash_fee_rate = FLASH_LOAN_FEE_RATES.get(
+            self.config.get('preferred_flash_loan_provider', 'AAVE'),
+            DEFAULT_FLASH_LOAN_FEE_RATE
+        )
+        
+    def _dex_id(self, dex_name: str) -> int:
+        """
+        Get the integer id of a DEX, adding it to the fee table on first sight
+        
+        Args:
+            dex_name: DEX name
+            
+        Returns:
+            Index into the DEX fee rate table
+        """
+        dex_id = self._dex_name_to_id.get(dex_name)
+        if dex_id is None:
+            # Get fee rate, default to 0.3% if DEX not found
+            fee_rate = DEX_FEE_RATES.get(dex_name.upper(), DEFAULT_DEX_FEE_RATE)
+            dex_id = self._dex_name_to_id[dex_name] = len(self._dex_fee_rates)
+            self._dex_fee_rates = np.append(self._dex_fee_rates, fee_rate)
+        return dex_id
+        
+    def _network_id(self, network: str) -> int:
+        """
+        Get the integer id of a network, adding it to the gas table on first sight
+        
+        Args:
+            network: Network name
+            
+        Returns:
+            Index into the gas cost table
+        """
+        network_id = self._network_to_id.get(network)
+        if network_id is None:
+            estimate = NETWORK_GAS_ESTIMATES.get(network.upper())
+            if estimate:
+                gas_units, gas_price_gwei, native_price_usd = estimate
+                gas_cost = (gas_units * gas_price_gwei * 1e-9) * native_price_usd
+            else:
+                gas_cost = DEFAULT_GAS_COST_USD
+            network_id = self._network_to_id[network] = len(self._gas_costs)
+            self._gas_costs = np.append(self._gas_costs, gas_cost)
+        return network_id
+        
+    def _resize_scan_buffers(self, size: int):
+        """
+        Allocate the per-scan input arrays
+        
+        Args:
+            size: Number of DEX quotes the buffers must hold
+        """
+        self._scan_size = size
+        self._price_buf = np.empty(size, dtype=np.float64)
+        self._liquidity_buf = np.empty(size, dtype=np.float64)
+        self._dex_id_buf = np.empty(size, dtype=np.intp)
+        self._network_id_buf = np.empty(size, dtype=np.intp)
+        self._fee_rate_buf = np.empty(size, dtype=np.float64)
+        self._gas_cost_buf = np.empty(size, dtype=np.float64)
         
     async def start_monitoring(self):
         """Start monitoring for arbitrage opportunities"""
@@ -53,11 +269,22 @@ class FlashLoanOrchestrator:
             # Start opportunity identification and execution loop
             opportunity_task = asyncio.create_task(self.opportunity_loop())
             
+            # Execution workers bound the number of concurrent executions
+            execution_tasks = [
+                asyncio.create_task(self._exec_worker())
+                for _ in range(self.max_concurrent_executions)
+            ]
+            
+            # Deliver alerts in the background
+            notify_task = asyncio.create_task(self._notify_worker())
+            
             # Wait for all tasks
             await asyncio.gather(
                 price_aggregation_task,
                 mempool_monitoring_task,
-                opportunity_task
+                opportunity_task,
+                notify_task,
+                *execution_tasks
             )
             
         except Exception as e:
@@ -72,8 +299,15 @@ class FlashLoanOrchestrator:
         """Main loop that identifies and executes arbitrage opportunities"""
         while self.running:
             try:
-                # Get latest price data
-                price_data = await self.price_aggregator.get_latest_prices()
+                # Wait for refreshed prices and merge updates that are already queued
+                updated_pairs = set(await self._price_queue.get())
+                while not self._price_queue.empty():
+                    updated_pairs.update(self._price_queue.get_nowait())
+                    
+                # Only rescan the token pairs that changed, and within them
+                # only the cheapest and most expensive quotes
+                self.update_pair_state(self.price_aggregator.get_prices_for(updated_pairs), updated_pairs)
+                price_data = self.get_candidate_prices(updated_pairs)
                 
                 # Identify potential arbitrage opportunities
                 opportunities = self.identify_arbitrage_opportunities(price_data)
@@ -84,260 +318,260 @@ class FlashLoanOrchestrator:
                 # Filter and sort opportunities by profitability
                 viable_opportunities = self.filter_opportunities(enhanced_opportunities)
                 
-                # Execute top opportunities
-                for opportunity in viable_opportunities[:5]:  # Limit to top 5
-                    asyncio.create_task(self.execute_opportunity(opportunity))
-                
-                # Short sleep to prevent excessive CPU usage
-                await asyncio.sleep(0.1)
+                # Queue top opportunities for the execution workers
+                for opportunity in viable_opportunities:
+                    self.queue_opportunity(opportunity)
                 
             except Exception as e:
                 logger.error(f"Error in opportunity loop: {str(e)}")
                 await asyncio.sleep(5)  # Longer sleep on error
     
-    def identify_arbitrage_opportunities(self, price_data: List[Dict]) -> List[Dict]:
+    def queue_opportunity(self, opportunity: Dict):
         """
-        Identify potential arbitrage opportunities from price data
+        Queue an opportunity for execution
         
         Args:
-            price_data: List of price data dictionaries
-            
-        Returns:
-            List of potential arbitrage opportunities
+            opportunity: Arbitrage opportunity details
         """
-        opportunities = []
+        self._exec_sequence += 1
+        entry = (opportunity['estimated_profit_usd'], -self._exec_sequence, time.monotonic(), opportunity)
         
-        # Group by token pair
-        token_pairs = {}
-        for price_entry in price_data:
-            token_pair = price_entry['token_pair']
-            if token_pair not in token_pairs:
-                token_pairs[token_pair] = []
-            token_pairs[token_pair].append(price_entry)
+        if len(self._exec_queue) >= self.exec_queue_size:
+            # Replace the least profitable queued opportunity if this one beats it
+            worst = self._exec_queue[0]
+            if entry[0] <= worst[0]:
+                logger.debug(f"Execution queue full, dropping opportunity for {opportunity['token_pair']}")
+                return
+                
+            self._exec_queue.pop(0)
+            logger.debug(f"Execution queue full, replaced opportunity for {worst[3]['token_pair']}")
+            bisect.insort(self._exec_queue, entry, key=lambda item: item[:2])
+            return
+            
+        bisect.insort(self._exec_queue, entry, key=lambda item: item[:2])
+        self._exec_available.release()
         
-        # Find price differences for each token pair
-        for token_pair, prices in token_pairs.items():
-            if len(prices) < 2:
+    async def _exec_worker(self):
+        """Execute queued opportunities one at a time, most profitable first"""
+        while self.running:
+            await self._exec_available.acquire()
+            _, _, queued_at, opportunity = self._exec_queue.pop()
+            
+            # Prices have refreshed since this opportunity was found
+            if time.monotonic() - queued_at > self.opportunity_max_age:
+                logger.debug(f"Discarding stale opportunity for {opportunity['token_pair']}")
                 continue
                 
-            # Compare each DEX with every other DEX
-            for i, source_dex in enumerate(prices):
-                for target_dex in prices[i+1:]:
-                    source_price = source_dex['price']
-                    target_price = target_dex['price']
-                    
-                    # Calculate price difference percentage
-                    if source_price <= 0 or target_price <= 0:
-                        continue
-                        
-                    price_diff_pct = abs((target_price - source_price) / source_price) * 100
-                    
-                    # Determine direction (buy at lower, sell at higher)
-                    if source_price < target_price:
-                        buy_dex = source_dex
-                        sell_dex = target_dex
-                    else:
-                        buy_dex = target_dex
-                        sell_dex = source_dex
-                    
-                    # Estimate potential profit
-                    # This is simplified - real calculation would account for fees, gas, etc.
-                    estimated_profit = self.calculate_estimated_profit(
-                        buy_dex, sell_dex, price_diff_pct
-                    )
-                    
-                    # Add to opportunities if profit is positive
-                    if estimated_profit > 0:
-                        opportunities.append({
-                            'token_pair': token_pair,
-                            'buy_dex': buy_dex['dex_name'],
-                            'sell_dex': sell_dex['dex_name'],
-                            'buy_price': min(source_price, target_price),
-                            'sell_price': max(source_price, target_price),
-                            'price_diff_pct': price_diff_pct,
-                            'estimated_profit_usd': estimated_profit,
-                            'network': buy_dex['network'],  # Assuming both DEXs are on same network
-                            'timestamp': time.time()
-                        })
-        
-        return opportunities
-    
-    def calculate_estimated_profit(
-        self, buy_dex: Dict, sell_dex: Dict, price_diff_pct: float
-    ) -> float:
+            await self.execute_opportunity(opportunity)
+                
+    def notify(self, message: str, priority: str = "medium"):
         """
-        Calculate estimated profit for an arbitrage opportunity
+        Queue an alert for the notification worker
         
         Args:
-            buy_dex: DEX data for buy side
-            sell_dex: DEX data for sell side
-            price_diff_pct: Price difference percentage
-            
-        Returns:
-            Estimated profit in USD
+            message: Alert message
+            priority: Alert priority
         """
-        # Get loan amount based on available liquidity
-        loan_amount = self.determine_loan_amount(buy_dex, sell_dex)
+        self._notify_queue.put_nowait((message, priority))
         
-        # Calculate gross profit before fees
-        gross_profit = loan_amount * (price_diff_pct / 100)
-        
-        # Estimate fees
-        flash_loan_fee = self.estimate_flash_loan_fee(loan_amount, buy_dex['network'])
-        dex_fees = self.estimate_dex_fees(loan_amount, buy_dex['dex_name'], sell_dex['dex_name'])
-        gas_cost = self.estimate_gas_cost(buy_dex['network'])
-        
-        # Calculate net profit
-        net_profit = gross_profit - flash_loan_fee - dex_fees - gas_cost
-        
-        return net_profit
-    
-    def determine_loan_amount(self, buy_dex: Dict, sell_dex: Dict) -> float:
+    async def _notify_worker(self):
+        """Send queued alerts one at a time"""
+        while self.running:
+            message, priority = await self._notify_queue.get()
+            try:
+                await self.notification_service.send_alert(message, priority=priority)
+            except Exception as e:
+                logger.error(f"Error sending alert: {str(e)}")
+            finally:
+                self._notify_queue.task_done()
+                
+    def update_pair_state(self, price_data: List[Dict], token_pairs=None):
         """
-        Determine appropriate loan amount based on DEX liquidity
+        Apply price updates to the per-pair sorted quote lists
+        
+        Each update replaces the previous quote of the same DEX and network
+        with a binary-search removal and insertion.
         
         Args:
-            buy_dex: DEX data for buy side
-            sell_dex: DEX data for sell side
-            
-        Returns:
-            Appropriate loan amount in USD
+            price_data: List of price data dictionaries
+            token_pairs: Token pairs for which price_data holds every live
+                quote; quotes of these pairs missing from it have expired and
+                are removed
         """
-        # Use a percentage of the available liquidity
-        # Typically, we don't want to use more than 1-2% of the pool to avoid excessive slippage
-        liquidity_limit = min(
-            buy_dex.get('liquidity', float('inf')),
-            sell_dex.get('liquidity', float('inf'))
-        ) * 0.01  # 1% of the smallest liquidity pool
-        
-        # Apply minimum and maximum constraints
-        min_loan = float(os.environ.get("MIN_LOAN_AMOUNT_USD", "1000"))
-        max_loan = float(os.environ.get("MAX_LOAN_AMOUNT_USD", "50000"))
-        
-        return max(min_loan, min(liquidity_limit, max_loan))
-    
-    def estimate_flash_loan_fee(self, loan_amount: float, network: str) -> float:
+        if token_pairs is not None:
+            live_keys: Dict[str, set] = {token_pair: set() for token_pair in token_pairs}
+            for price_entry in price_data:
+                live_keys.setdefault(price_entry['token_pair'], set()).add(
+                    (price_entry['dex_name'], price_entry['network'])
+                )
+            for token_pair, keys in live_keys.items():
+                entries = self._pair_entries.get(token_pair)
+                if not entries:
+                    continue
+                state = self._pair_state[token_pair]
+                for key in [key for key in entries if key not in keys]:
+                    item = entries.pop(key)[0]
+                    if item is not None:
+                        state.pop(bisect.bisect_left(state, item))
+                        
+        for price_entry in price_data:
+            token_pair = price_entry['token_pair']
+            key = (price_entry['dex_name'], price_entry['network'])
+            state = self._pair_state.setdefault(token_pair, [])
+            entries = self._pair_entries.setdefault(token_pair, {})
+            
+            previous = entries.get(key)
+            if previous is not None:
+                if previous[1] is price_entry:
+                    continue  # Unchanged cached quote
+                if previous[0] is not None:
+                    state.pop(bisect.bisect_left(state, previous[0]))
+                    
+            # Quotes without a valid price are tracked but never scanned
+            item = (price_entry['price'], key) if price_entry['price'] > 0 else None
+            if item is not None:
+                bisect.insort(state, item)
+            entries[key] = (item, price_entry)
+            
+    def get_candidate_prices(self, token_pairs) -> List[Dict]:
         """
-        Estimate flash loan fee based on provider and amount
+        Get the quotes worth comparing for each token pair
         
         Args:
-            loan_amount: Amount to be borrowed in USD
-            network: Network (BSC or Polygon)
+            token_pairs: Token pairs to scan
             
         Returns:
-            Estimated flash loan fee in USD
+            The cheapest and most expensive price data dictionaries per pair
         """
-        # Fee rates vary by provider:
-        # - Aave: 0.09%
-        # - DyDx: 0% (gas only)
-        # - DODO: 0.1%
-        # - Uniswap V3 Flash Swaps: ~0.05% (varies)
-        
-        provider = self.config.get('preferred_flash_loan_provider', 'AAVE')
-        
-        if provider == 'AAVE':
-            return loan_amount * 0.0009
-        elif provider == 'DYDX':
-            return 0  # Gas only
-        elif provider == 'DODO':
-            return loan_amount * 0.001
-        elif provider == 'UNISWAP_V3':
-            return loan_amount * 0.0005
-        else:
-            return loan_amount * 0.001  # Default
-    
-    def estimate_dex_fees(self, loan_amount: float, buy_dex: str, sell_dex: str) -> float:
+        k = self.pair_candidates
+        candidates = []
+        for token_pair in token_pairs:
+            state = self._pair_state.get(token_pair, [])
+            items = state if len(state) <= 2 * k else state[:k] + state[-k:]
+            entries = self._pair_entries[token_pair] if items else {}
+            candidates.extend(entries[key][1] for _, key in items)
+        return candidates
+        
+    def identify_arbitrage_opportunities(self, price_data: List[Dict]) -> List[Dict]:
         """
-        Estimate DEX trading fees
+        Identify potential arbitrage opportunities from price data
         
         Args:
-            loan_amount: Amount to be traded in USD
-            buy_dex: DEX name for buying
-            sell_dex: DEX name for selling
+            price_data: List of price data dictionaries
             
         Returns:
-            Estimated DEX fees in USD
+            List of potential arbitrage opportunities
         """
-        # DEX fee rates (typical values)
-        dex_fee_rates = {
-            'PANCAKESWAP': 0.0025,  # 0.25%
-            'SUSHISWAP': 0.003,     # 0.3%
-            'UNISWAP': 0.003,       # 0.3%
-            'QUICKSWAP': 0.003,     # 0.3%
-            'APESWAP': 0.003,       # 0.3%
-            '1INCH': 0.003,         # Variable, using 0.3% as estimate
-            'DODO': 0.001,          # 0.1%
-            'CURVE': 0.0004,        # 0.04% (varies by pool)
-            'BALANCER': 0.002,      # 0.2% (varies by pool)
-            'KYBERSWAP': 0.003      # 0.3%
-        }
-        
-        # Get fee rates, default to 0.3% if DEX not found
-        buy_fee_rate = dex_fee_rates.get(buy_dex.upper(), 0.003)
-        sell_fee_rate = dex_fee_rates.get(sell_dex.upper(), 0.003)
-        
-        # Calculate total fees
-        buy_fee = loan_amount * buy_fee_rate
-        sell_fee = loan_amount * sell_fee_rate
-        
-        return buy_fee + sell_fee
+        opportunities = []
+        
+        # Group by interned token pair id
+        groups: Dict[int, List[Dict]] = {}
+        for price_entry in price_data:
+            pair_id = self._pair_id.get(price_entry['token_pair'])
+            if pair_id is None:
+                pair_id = self._pair_id[price_entry['token_pair']] = len(self._pair_names)
+                self._pair_names.append(price_entry['token_pair'])
+            groups.setdefault(pair_id, []).append(price_entry)
+        
+        # Find price differences for each token pair
+        for pair_id, prices in groups.items():
+            if len(prices) < 2:
+                continue
+                
+            opportunities.extend(self.scan_token_pair(self._pair_names[pair_id], prices))
+        
+        return opportunities
     
-    def estimate_gas_cost(self, network: str) -> float:
+    def scan_token_pair(self, token_pair: str, prices: List[Dict]) -> List[Dict]:
         """
-        Estimate gas cost for flash loan transaction
+        Compare every pair of DEX prices for one token pair at once
+        
+        Prices, liquidity and fee rates are packed into arrays and all DEX
+        pairs are evaluated by compute_net_profits; dictionaries are only
+        built for pairs with a positive estimated profit.
         
         Args:
-            network: Network (BSC or Polygon)
+            token_pair: Token pair (e.g., "ETH-USDT")
+            prices: Price data dictionaries for the token pair
             
         Returns:
-            Estimated gas cost in USD
+            List of potential arbitrage opportunities for the token pair
         """
-        # Gas costs vary by network and congestion
-        # These are rough estimates
-        if network.upper() == 'BSC':
-            gas_units = 500000  # Complex flash loan on BSC
-            gas_price_gwei = 5  # BSC is typically 5 Gwei
-            bnb_price_usd = 300  # Estimated BNB price
-            return (gas_units * gas_price_gwei * 1e-9) * bnb_price_usd
-        elif network.upper() == 'POLYGON':
-            gas_units = 800000  # Complex flash loan on Polygon
-            gas_price_gwei = 30  # Polygon can be 30+ Gwei
-            matic_price_usd = 1  # Estimated MATIC price
-            return (gas_units * gas_price_gwei * 1e-9) * matic_price_usd
-        else:
-            return 10  # Default estimate
+        n = len(prices)
+        if n > self._scan_size:
+            self._resize_scan_buffers(n)
+            
+        # Fill the reused input buffers instead of allocating new arrays per scan
+        price = self._price_buf[:n]
+        liquidity = self._liquidity_buf[:n]
+        dex_ids = self._dex_id_buf[:n]
+        network_ids = self._network_id_buf[:n]
+        for i, entry in enumerate(prices):
+            price[i] = entry['price']
+            entry_liquidity = entry.get('liquidity')
+            if entry.get('source') == 'onchain':
+                # On-chain fallback liquidity is in token B units, not USD:
+                # only the minimum loan is sized on these quotes
+                liquidity[i] = 0.0
+            else:
+                liquidity[i] = entry_liquidity if entry_liquidity is not None else np.inf
+            dex_ids[i] = self._dex_id(entry['dex_name'])
+            network_ids[i] = self._network_id(entry['network'])
+            
+        fee_rates = np.take(self._dex_fee_rates, dex_ids, out=self._fee_rate_buf[:n])
+        gas_costs = np.take(self._gas_costs, network_ids, out=self._gas_cost_buf[:n])
+        
+        buy, sell, buy_price, sell_price, price_diff_pct, loan_amount, net_profit = compute_net_profits(
+            price, liquidity, fee_rates, gas_costs,
+            self._flash_fee_rate,
+            self.min_loan_amount, self.max_loan_amount
+        )
+        
+        # Add to opportunities if profit is positive
+        timestamp = time.time()
+        opportunities = []
+        for k in np.flatnonzero(net_profit > 0):
+            buy_dex, sell_dex = prices[buy[k]], prices[sell[k]]
+            opportunities.append({
+                'token_pair': token_pair,
+                'buy_dex': buy_dex['dex_name'],
+                'sell_dex': sell_dex['dex_name'],
+                'buy_price': float(buy_price[k]),
+                'sell_price': float(sell_price[k]),
+                'price_diff_pct': float(price_diff_pct[k]),
+                'estimated_profit_usd': float(net_profit[k]),
+                'loan_amount': float(loan_amount[k]),
+                'buy_liquidity': buy_dex.get('liquidity'),
+                'sell_liquidity': sell_dex.get('liquidity'),
+                'network': buy_dex['network'],  # Assuming both DEXs are on same network
+                'timestamp': timestamp
+            })
+            
+        return opportunities
     
-    def filter_opportunities(self, opportunities: List[Dict]) -> List[Dict]:
+    def filter_opportunities(self, opportunities: List[Dict], limit: int = 5) -> List[Dict]:
         """
         Filter and sort arbitrage opportunities
         
         Args:
             opportunities: List of potential arbitrage opportunities
+            limit: Maximum number of opportunities to return
             
         Returns:
-            Filtered and sorted list of viable opportunities
+            The most profitable viable opportunities, sorted by estimated profit
         """
-        # Filter by minimum profit threshold
+        # Filter by AI confidence if available
+        check_confidence = bool(opportunities) and 'ai_confidence' in opportunities[0]
+        
+        # Filter by minimum profit threshold and confidence in a single pass
         viable_opportunities = [
             op for op in opportunities 
             if op['estimated_profit_usd'] >= self.minimum_profit_threshold
+            and (not check_confidence or op.get('ai_confidence', 0) >= self.confidence_threshold)
         ]
         
-        # Filter by AI confidence if available
-        if viable_opportunities and 'ai_confidence' in viable_opportunities[0]:
-            confidence_threshold = float(os.environ.get("AI_CONFIDENCE_THRESHOLD", "0.6"))
-            viable_opportunities = [
-                op for op in viable_opportunities 
-                if op.get('ai_confidence', 0) >= confidence_threshold
-            ]
-        
-        # Sort by estimated profit (descending)
-        viable_opportunities.sort(
-            key=lambda x: x['estimated_profit_usd'], 
-            reverse=True
-        )
-        
-        return viable_opportunities
+        # Select the top opportunities by estimated profit (descending)
+        return heapq.nlargest(limit, viable_opportunities, key=lambda x: x['estimated_profit_usd'])
     
     async def execute_opportunity(self, opportunity: Dict):
         """
@@ -346,68 +580,59 @@ class FlashLoanOrchestrator:
         Args:
             opportunity: Arbitrage opportunity details
         """
-        # Use semaphore to limit concurrent executions
-        async with self.execution_semaphore:
-            try:
-                logger.info(f"Executing arbitrage for {opportunity['token_pair']}: "
-                           f"{opportunity['buy_dex']} -> {opportunity['sell_dex']}, "
-                           f"Expected profit: ${opportunity['estimated_profit_usd']:.2f}")
+        try:
+            logger.info(f"Executing arbitrage for {opportunity['token_pair']}: "
+                       f"{opportunity['buy_dex']} -> {opportunity['sell_dex']}, "
+                       f"Expected profit: ${opportunity['estimated_profit_usd']:.2f}")
+            
+            # Execute the flash loan with the liquidity-aware amount sized during the scan
+            execution_result = await self.execution_engine.execute_flash_loan(
+                token_pair=opportunity['token_pair'],
+                source_dex=opportunity['buy_dex'],
+                target_dex=opportunity['sell_dex'],
+                amount=opportunity['loan_amount'],
+                network=opportunity['network']
+            )
+            
+            # Process execution result
+            if execution_result['success']:
+                logger.info(f"Arbitrage executed successfully: {execution_result['tx_hash']}, "
+                           f"Profit: ${execution_result['profit_usd']:.2f}")
                 
-                # Determine loan amount
-                loan_amount = opportunity.get('loan_amount', 
-                                             self.determine_loan_amount(
-                                                 {'dex_name': opportunity['buy_dex']}, 
-                                                 {'dex_name': opportunity['sell_dex']}
-                                             ))
+                # Notify if profit is significant
+                if execution_result['profit_usd'] >= self.minimum_profit_threshold * 2:
+                    self.notify(
+                        f"Profitable arbitrage executed!\n"
+                        f"Token: {opportunity['token_pair']}\n"
+                        f"Route: {opportunity['buy_dex']} -> {opportunity['sell_dex']}\n"
+                        f"Profit: ${execution_result['profit_usd']:.2f}\n"
+                        f"Transaction: {execution_result['tx_hash']}",
+                        priority="medium"
+                    )
                 
-                # Execute the flash loan
-                execution_result = await self.execution_engine.execute_flash_loan(
-                    token_pair=opportunity['token_pair'],
-                    source_dex=opportunity['buy_dex'],
-                    target_dex=opportunity['sell_dex'],
-                    amount=loan_amount,
-                    network=opportunity['network']
-                )
+                # Update reinvestment module with new profits
+                self.reinvestment_module.update_capital(execution_result['profit_usd'])
                 
-                # Process execution result
-                if execution_result['success']:
-                    logger.info(f"Arbitrage executed successfully: {execution_result['tx_hash']}, "
-                               f"Profit: ${execution_result['profit_usd']:.2f}")
-                    
-                    # Notify if profit is significant
-                    if execution_result['profit_usd'] >= self.minimum_profit_threshold * 2:
-                        await self.notification_service.send_alert(
-                            f"Profitable arbitrage executed!\n"
-                            f"Token: {opportunity['token_pair']}\n"
-                            f"Route: {opportunity['buy_dex']} -> {opportunity['sell_dex']}\n"
-                            f"Profit: ${execution_result['profit_usd']:.2f}\n"
-                            f"Transaction: {execution_result['tx_hash']}",
-                            priority="medium"
-                        )
-                    
-                    # Update reinvestment module with new profits
-                    self.reinvestment_module.update_capital(execution_result['profit_usd'])
-                    
-                else:
-                    logger.warning(f"Arbitrage execution failed: {execution_result['error']}")
-                    
-                    # Notify on failure if it was a high-value opportunity
-                    if opportunity['estimated_profit_usd'] >= self.minimum_profit_threshold * 5:
-                        await self.notification_service.send_alert(
-                            f"High-value arbitrage failed!\n"
-                            f"Token: {opportunity['token_pair']}\n"
-                            f"Route: {opportunity['buy_dex']} -> {opportunity['sell_dex']}\n"
-                            f"Expected profit: ${opportunity['estimated_profit_usd']:.2f}\n"
-                            f"Error: {execution_result['error']}",
-                            priority="high"
-                        )
+            else:
+                logger.warning(f"Arbitrage execution failed: {execution_result['error']}")
                 
-                # Allow a short delay before next execution
-                await asyncio.sleep(self.execution_interval / 1000)
-                
-            except Exception as e:
-                logger.error(f"Error executing arbitrage opportunity: {str(e)}")
-                await self.notification_service.send_alert(
-                    f"Error executing arbitrage:\n{str(e)}",
-                    priority="high"
-                )
+                # Notify on failure if it was a high-value opportunity
+                if opportunity['estimated_profit_usd'] >= self.minimum_profit_threshold * 5:
+                    self.notify(
+                        f"High-value arbitrage failed!\n"
+                        f"Token: {opportunity['token_pair']}\n"
+                        f"Route: {opportunity['buy_dex']} -> {opportunity['sell_dex']}\n"
+                        f"Expected profit: ${opportunity['estimated_profit_usd']:.2f}\n"
+                        f"Error: {execution_result['error']}",
+                        priority="high"
+                    )
+            
+            # Allow a short delay before next execution
+            await asyncio.sleep(self.execution_interval / 1000)
+            
+        except Exception as e:
+            logger.error(f"Error executing arbitrage opportunity: {str(e)}")
+            self.notify(
+                f"Error executing arbitrage:\n{str(e)}",
+                priority="high"
+            )
@@ -0,0 +1,67 @@
+import asyncio
+import logging
+import os
+from typing import List, Optional, Tuple
+import aiohttp
+from eth_abi import decode as abi_decode, encode as abi_encode
+from eth_abi.exceptions import DecodingError
+from web3 import Web3
+from web3.exceptions import Web3Exception
+
+logger = logging.getLogger(__name__)
+
+# Multicall3 is deployed at the same address on every supported network and
+# keeps the Multicall2 tryAggregate interface
+DEFAULT_MULTICALL_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+MULTICALL_ADDRESSES = {
+    "BSC": os.environ.get("MULTICALL_BSC", DEFAULT_MULTICALL_ADDRESS),
+    "POLYGON": os.environ.get("MULTICALL_POLYGON", DEFAULT_MULTICALL_ADDRESS)
+}
+
+TRY_AGGREGATE_SELECTOR = bytes(Web3.keccak(text="tryAggregate(bool,(address,bytes)[])")[:4])
+
+
+def encode_call(signature: str, types: List[str] = (), args: List = ()) -> bytes:
+    """
+    Encode calldata for a contract function
+
+    Args:
+        signature: Function signature (e.g., "getReserves()")
+        types: ABI types of the arguments
+        args: Argument values
+
+    Returns:
+        Function selector followed by the encoded arguments
+    """
+    selector = bytes(Web3.keccak(text=signature)[:4])
+    return selector + abi_encode(list(types), list(args)) if types else selector
+
+
+async def try_aggregate(web3, network: str, calls: List[Tuple[str, bytes]]) -> Optional[List[Tuple[bool, bytes]]]:
+    """
+    Execute many read-only calls in a single eth_call through tryAggregate
+
+    Args:
+        web3: Async Web3 instance for the network
+        network: Network name
+        calls: List of (target address, calldata) tuples
+
+    Returns:
+        List of (success, return data) tuples in call order, or None if the
+        aggregate call itself failed
+    """
+    multicall_address = MULTICALL_ADDRESSES.get(network.upper())
+    if not multicall_address or not calls:
+        return None
+
+    try:
+        data = TRY_AGGREGATE_SELECTOR + abi_encode(
+            ['bool', '(address,bytes)[]'],
+            [False, [(Web3.to_checksum_address(target), call_data) for target, call_data in calls]]
+        )
+        raw = await web3.eth.call({'to': Web3.to_checksum_address(multicall_address), 'data': data})
+        return [(success, bytes(return_data)) for success, return_data in abi_decode(['(bool,bytes)[]'], bytes(raw))[0]]
+
+    except (Web3Exception, aiohttp.ClientError, asyncio.TimeoutError, OSError, DecodingError) as e:
+        logger.error(f"Multicall on {network} failed: {str(e)}")
+        return None
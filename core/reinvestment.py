@@ -2,10 +2,15 @@ import logging
 import time
 from typing import Dict, List, Optional
 import os
-import json
+import atexit
+import numpy as np
+from utils.json_utils import json_loads, json_dumps_bytes
 
 logger = logging.getLogger(__name__)
 
+# Number of profit records kept in memory and in the state file
+PROFIT_HISTORY_SIZE = 1000
+
 class ReinvestmentModule:
     """
     Manages capital allocation and reinvestment of profits
@@ -27,7 +32,21 @@ class ReinvestmentModule:
         self.initial_capital = float(os.environ.get("INITIAL_CAPITAL_USD", "1000.0"))
         self.current_capital = self.initial_capital
         self.total_profit = 0.0
-        self.profit_history = []
+        
+        # Profit history as a ring buffer of amounts and timestamps
+        self._profit_amounts = np.zeros(PROFIT_HISTORY_SIZE, dtype=np.float64)
+        self._profit_timestamps = np.zeros(PROFIT_HISTORY_SIZE, dtype=np.int64)  # nanoseconds
+        self._profit_head = 0
+        self._profit_count = 0
+        
+        # Capital summary cache, keyed on the update counter and a 5 second time bucket
+        self.summary_ttl = 5.0  # seconds
+        self._update_counter = 0
+        self._summary_cache = None
+        self._summary_cache_key = None
+        
+        # Latest allocation grid from redistribute_capital, indexed [network, dex]
+        self._allocation_matrix = np.zeros((0, 0), dtype=np.float64)
         
         # Load allocation settings
         self.max_allocation_percent = float(os.environ.get("MAX_ALLOCATION_PERCENT", "80.0"))
@@ -38,20 +57,38 @@ class ReinvestmentModule:
         self.max_allocation_per_trade = float(os.environ.get("MAX_ALLOCATION_PER_TRADE", "25.0"))
         self.allocation_increase_threshold = float(os.environ.get("ALLOCATION_INCREASE_THRESHOLD", "5.0"))
         
+        # State persistence, batched so every trade does not rewrite the file
+        self.state_file = os.environ.get("STATE_FILE", "reinvestment_state.json")
+        self.save_every_updates = 10
+        self.save_interval = 5.0  # seconds
+        self._unsaved_updates = 0
+        self._last_save = time.time()
+        
         # Load state from storage if available
         self.load_state()
         
+        # Persist any batched updates on shutdown
+        atexit.register(self.flush_state)
+        
     def load_state(self):
         """Load state from storage if available"""
         try:
-            state_file = os.environ.get("STATE_FILE", "reinvestment_state.json")
-            if os.path.exists(state_file):
-                with open(state_file, 'r') as f:
-                    state = json.load(f)
+            if os.path.exists(self.state_file):
+                with open(self.state_file, 'rb') as f:
+                    state = json_loads(f.read())
                     
                     self.current_capital = state.get('current_capital', self.initial_capital)
                     self.total_profit = state.get('total_profit', 0.0)
-                    self.profit_history = state.get('profit_history', [])
+                    
+                    if 'profit_amounts' in state:
+                        amounts = state['profit_amounts'][-PROFIT_HISTORY_SIZE:]
+                        timestamps = state['profit_timestamps'][-PROFIT_HISTORY_SIZE:]
+                        for amount, timestamp_ns in zip(amounts, timestamps):
+                            self._record_profit(amount, timestamp_ns)
+                    else:
+                        # Older state files store a list of profit records
+                        for entry in state.get('profit_history', [])[-PROFIT_HISTORY_SIZE:]:
+                            self._record_profit(entry['amount'], int(entry['timestamp'] * 1e9))
                     
                     logger.info(f"Loaded reinvestment state: Capital=${self.current_capital}, "
                                f"Total Profit=${self.total_profit}")
@@ -61,21 +98,69 @@ class ReinvestmentModule:
     def save_state(self):
         """Save current state to storage"""
         try:
-            state_file = os.environ.get("STATE_FILE", "reinvestment_state.json")
+            # Profit history is stored as parallel columns in chronological order
+            indices = self._recent_indices(self._profit_count)
             state = {
                 'current_capital': self.current_capital,
                 'total_profit': self.total_profit,
-                'profit_history': self.profit_history,
+                'profit_amounts': self._profit_amounts[indices].tolist(),
+                'profit_timestamps': self._profit_timestamps[indices].tolist(),
                 'last_updated': time.time()
             }
             
-            with open(state_file, 'w') as f:
-                json.dump(state, f)
-                
+            # Write to a temporary file and swap it in so a crash never
+            # leaves a truncated state file
+            tmp_file = f"{self.state_file}.tmp"
+            with open(tmp_file, 'wb') as f:
+                f.write(json_dumps_bytes(state))
+            os.replace(tmp_file, self.state_file)
+            
+            self._unsaved_updates = 0
+            self._last_save = time.time()
             logger.debug("Saved reinvestment state")
         except Exception as e:
             logger.error(f"Error saving reinvestment state: {str(e)}")
             
+    def flush_state(self):
+        """Save state if there are updates that have not been written yet"""
+        if self._unsaved_updates:
+            self.save_state()
+            
+    @property
+    def profit_history(self) -> List[Dict]:
+        """Profit records in chronological order"""
+        indices = self._recent_indices(self._profit_count)
+        return [
+            {'amount': float(amount), 'timestamp': int(timestamp) / 1e9}
+            for amount, timestamp in zip(self._profit_amounts[indices], self._profit_timestamps[indices])
+        ]
+        
+    def _record_profit(self, amount: float, timestamp_ns: int):
+        """
+        Append a profit record, overwriting the oldest one when full
+        
+        Args:
+            amount: Amount of profit in USD
+            timestamp_ns: Time of the profit in nanoseconds since the epoch
+        """
+        self._profit_amounts[self._profit_head] = amount
+        self._profit_timestamps[self._profit_head] = timestamp_ns
+        self._profit_head = (self._profit_head + 1) % PROFIT_HISTORY_SIZE
+        self._profit_count = min(self._profit_count + 1, PROFIT_HISTORY_SIZE)
+        
+    def _recent_indices(self, count: int) -> np.ndarray:
+        """
+        Get ring buffer indices of the most recent profit records
+        
+        Args:
+            count: Maximum number of records
+            
+        Returns:
+            Indices in chronological order
+        """
+        count = min(count, self._profit_count)
+        return (self._profit_head - count + np.arange(count)) % PROFIT_HISTORY_SIZE
+        
     def update_capital(self, profit_amount: float):
         """
         Update capital with new profit
@@ -91,19 +176,16 @@ class ReinvestmentModule:
         self.current_capital += profit_amount
         
         # Record profit in history
-        self.profit_history.append({
-            'amount': profit_amount,
-            'timestamp': time.time()
-        })
-        
-        # Trim history if it gets too large
-        if len(self.profit_history) > 1000:
-            self.profit_history = self.profit_history[-1000:]
-            
+        self._record_profit(profit_amount, time.time_ns())
+        self._update_counter += 1
+        
         logger.info(f"Capital updated: +${profit_amount:.2f}, Total: ${self.current_capital:.2f}")
         
-        # Save the updated state
-        self.save_state()
+        # Save the updated state every few updates or seconds
+        self._unsaved_updates += 1
+        if (self._unsaved_updates >= self.save_every_updates or
+                time.time() - self._last_save >= self.save_interval):
+            self.save_state()
         
         # Adjust allocations if needed
         self.adjust_allocations()
@@ -111,7 +193,7 @@ class ReinvestmentModule:
     def adjust_allocations(self):
         """Adjust capital allocations based on current performance"""
         # Calculate recent performance
-        recent_profits = sum(entry['amount'] for entry in self.profit_history[-50:])
+        recent_profits = float(self._profit_amounts[self._recent_indices(50)].sum())
         roi_percent = (recent_profits / max(1.0, self.current_capital - recent_profits)) * 100
         
         logger.info(f"Recent performance: ${recent_profits:.2f}, ROI: {roi_percent:.2f}%")
@@ -177,17 +259,22 @@ class ReinvestmentModule:
         Returns:
             Dictionary with capital summary
         """
+        # Reuse the cached summary until capital changes or the time bucket rolls over
+        now_ns = time.time_ns()
+        cache_key = (self._update_counter, int(now_ns // (self.summary_ttl * 1e9)))
+        if cache_key == self._summary_cache_key:
+            return dict(self._summary_cache)
+            
         # Calculate recent profit metrics
-        recent_1h = sum(entry['amount'] for entry in self.profit_history 
-                      if entry['timestamp'] > time.time() - 3600)
-        recent_24h = sum(entry['amount'] for entry in self.profit_history 
-                       if entry['timestamp'] > time.time() - 86400)
+        # Unused slots have a zero timestamp and fall outside both windows
+        recent_1h = float(self._profit_amounts[self._profit_timestamps > now_ns - 3600 * 10**9].sum())
+        recent_24h = float(self._profit_amounts[self._profit_timestamps > now_ns - 86400 * 10**9].sum())
         
         # Calculate ROI
         roi_total = (self.total_profit / self.initial_capital) * 100 if self.initial_capital > 0 else 0
         roi_24h = (recent_24h / self.initial_capital) * 100 if self.initial_capital > 0 else 0
         
-        return {
+        self._summary_cache = {
             'initial_capital': self.initial_capital,
             'current_capital': self.current_capital,
             'total_profit': self.total_profit,
@@ -197,8 +284,11 @@ class ReinvestmentModule:
             'roi_24h_percent': roi_24h,
             'allocation_per_trade_percent': self.max_allocation_per_trade,
             'max_pool_impact_percent': self.max_pool_impact_percent,
-            'transaction_count': len(self.profit_history)
+            'transaction_count': self._profit_count
         }
+        self._summary_cache_key = cache_key
+        
+        return dict(self._summary_cache)
         
     def redistribute_capital(self, networks: List[str], dexes: List[str]) -> Dict[str, float]:
         """
@@ -225,11 +315,18 @@ class ReinvestmentModule:
         # Base allocation per network+DEX node
         base_allocation = available_capital / total_nodes
         
+        # Allocation grid indexed by network and DEX position
+        self._allocation_matrix = np.full((len(networks), len(dexes)), base_allocation)
+        
         # Create allocation map
         allocations = {}
-        for network in networks:
-            for dex in dexes:
-                node_key = f"{network}_{dex}"
-                allocations[node_key] = base_allocation
+        for i, network in enumerate(networks):
+            for j, dex in enumerate(dexes):
+                allocations[f"{network}_{dex}"] = float(self._allocation_matrix[i, j])
                 
         return allocations
+        
+    @property
+    def allocation_matrix(self) -> np.ndarray:
+        """Allocations from the last redistribute_capital call, shaped [network, dex]"""
+        return self._allocation_matrix
@@ -1,11 +1,26 @@
 import logging
+import asyncio
 import os
-from typing import Dict, Optional
-from web3 import Web3, HTTPProvider
+import time
+import threading
+import functools
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import aiohttp
+from web3 import Web3, AsyncWeb3, HTTPProvider, AsyncHTTPProvider
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import config
+from dexs.http_sessions import create_connector, prewarm
 
 logger = logging.getLogger(__name__)
 
+@functools.lru_cache(maxsize=1024)
+def _checksum(address: str) -> str:
+    """Checksum an address, caching the Keccak-256 result"""
+    return Web3.to_checksum_address(address)
+
 class Web3Manager:
     """
     Manages Web3 connections to different blockchain networks
@@ -15,15 +30,87 @@ class Web3Manager:
         """Initialize the Web3Manager"""
         self.web3_instances = {}
         self.private_key = os.environ.get("TRADING_PRIVATE_KEY")
+        self.wallet_address = self._derive_wallet_address()
+        
+        # Keep-alive HTTP session shared by all RPC providers
+        self.rpc_timeout = float(os.environ.get("RPC_TIMEOUT_SECONDS", "5"))
+        self.session = self._create_session()
+        
+        # Async providers for the RPC helpers, sharing one aiohttp connection pool;
+        # created on first use because they need a running event loop
+        self.async_web3_instances = {}
+        self.async_session: Optional[aiohttp.ClientSession] = None
+        self._async_lock = asyncio.Lock()
+        
+        # Cached liveness per network, refreshed by a background task
+        self.liveness_interval = 30.0  # seconds
+        self._connected: Dict[str, bool] = {}
+        self._liveness_task: Optional[asyncio.Task] = None
+        self._prewarm_task: Optional[asyncio.Task] = None
+        
+        # Circuit breaker per network: (consecutive failures, open until monotonic time)
+        self.breaker_threshold = 5
+        self.breaker_cooldown = 10.0  # seconds
+        self._breaker: Dict[str, Tuple[int, float]] = {}
+        self.fallback_async_web3_instances = {}
+        
+        # Latest block per network and its monotonic receive time, pushed by
+        # websocket newHeads subscriptions; heads older than head_max_age
+        # (a stalled socket) are ignored in favour of RPC
+        self.head_max_age = float(os.environ.get("BLOCK_HEAD_MAX_AGE_SEC", "10"))
+        self._latest_block: Dict[str, Tuple[int, float]] = {}
+        self._head_tasks = []
         
         # Initialize connections
         self._initialize_connections()
         
+    def _derive_wallet_address(self) -> Optional[str]:
+        """
+        Derive the trading wallet address from the private key once
+        
+        Returns:
+            Wallet address or None if no valid private key is configured
+        """
+        if not self.private_key:
+            return None
+            
+        try:
+            from eth_account import Account
+            return Account.from_key(self.private_key).address
+        except Exception as e:
+            logger.error(f"Error deriving wallet address from private key: {str(e)}")
+            return None
+            
+    def _create_session(self) -> requests.Session:
+        """
+        Create a pooled HTTP session for JSON-RPC requests
+        
+        Returns:
+            Session with keep-alive connection pools mounted
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=128,
+            # Retry failed connects only; a read retry could resend a transaction
+            max_retries=Retry(total=2, connect=2, read=0, backoff_factor=0.1, allowed_methods=None)
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+        
     def _initialize_connections(self):
-        """Initialize Web3 connections for configured networks"""
-        for network, network_config in config.NETWORK_CONFIG.items():
-            if network_config.get("enabled", False):
-                self._initialize_network(network, network_config)
+        """Initialize Web3 connections for configured networks concurrently"""
+        enabled_networks = [
+            (network, network_config) for network, network_config in config.NETWORK_CONFIG.items()
+            if network_config.get("enabled", False)
+        ]
+        if not enabled_networks:
+            return
+            
+        # Each dial is independent blocking I/O, so connect to all networks at once
+        with ThreadPoolExecutor(max_workers=min(16, len(enabled_networks))) as executor:
+            list(executor.map(lambda item: self._initialize_network(*item), enabled_networks))
                 
     def _initialize_network(self, network: str, network_config: Dict):
         """
@@ -40,7 +127,11 @@ class Web3Manager:
                 return
                 
             # Create Web3 instance
-            web3 = Web3(HTTPProvider(rpc_url))
+            web3 = Web3(HTTPProvider(
+                rpc_url,
+                request_kwargs={"timeout": self.rpc_timeout},
+                session=self.session
+            ))
             
             # Add PoA middleware for supported networks (like BSC)
             # Disabled for compatibility
@@ -50,6 +141,7 @@ class Web3Manager:
             # Test connection
             if web3.is_connected():
                 self.web3_instances[network] = web3
+                self._connected[network] = True
                 block_number = web3.eth.block_number
                 logger.info(f"Connected to {network} at block {block_number}")
             else:
@@ -58,6 +150,120 @@ class Web3Manager:
         except Exception as e:
             logger.error(f"Error initializing Web3 for {network}: {str(e)}")
             
+    async def initialize_async(self):
+        """Create async Web3 instances for the connected networks"""
+        async with self._async_lock:
+            if self.async_session is not None:
+                return
+                
+            self.async_session = aiohttp.ClientSession(
+                connector=create_connector(limit=100, keepalive_timeout=75),
+                timeout=aiohttp.ClientTimeout(total=self.rpc_timeout)
+            )
+            
+            for network in self.web3_instances:
+                try:
+                    network_config = config.NETWORK_CONFIG[network]
+                    self.async_web3_instances[network] = await self._create_async_web3(network_config["rpc_url"])
+                    
+                    # Secondary endpoint used while the primary's circuit breaker is open
+                    fallback_rpc_url = network_config.get("fallback_rpc_url")
+                    if fallback_rpc_url:
+                        self.fallback_async_web3_instances[network] = await self._create_async_web3(fallback_rpc_url)
+                except Exception as e:
+                    logger.error(f"Error initializing async Web3 for {network}: {str(e)}")
+                    
+            # Resolve and connect to the RPC endpoints before the first real call
+            rpc_urls = [
+                url for network in self.web3_instances
+                for url in (config.NETWORK_CONFIG[network]["rpc_url"], config.NETWORK_CONFIG[network].get("fallback_rpc_url"))
+            ]
+            self._prewarm_task = asyncio.create_task(prewarm(rpc_urls, self.async_session))
+            
+            self._liveness_task = asyncio.create_task(self._liveness_loop())
+            
+            # Track new blocks over websockets where a websocket URL is configured
+            for network in self.web3_instances:
+                ws_url = config.NETWORK_CONFIG[network].get("ws_url")
+                if ws_url:
+                    self._head_tasks.append(asyncio.create_task(self._subscribe_new_heads(network, ws_url)))
+            
+    async def _create_async_web3(self, rpc_url: str) -> AsyncWeb3:
+        """
+        Create an async Web3 instance on the shared aiohttp session
+        
+        Args:
+            rpc_url: JSON-RPC endpoint URL
+            
+        Returns:
+            Async Web3 instance
+        """
+        provider = AsyncHTTPProvider(rpc_url)
+        await provider.cache_async_session(self.async_session)
+        return AsyncWeb3(provider)
+        
+    async def _subscribe_new_heads(self, network: str, ws_url: str):
+        """
+        Keep the latest block number of a network updated from a newHeads subscription
+        
+        Args:
+            network: Network name
+            ws_url: Websocket RPC URL for the network
+        """
+        from web3 import WebSocketProvider
+        
+        while True:
+            try:
+                async with AsyncWeb3(WebSocketProvider(ws_url)) as ws_web3:
+                    await ws_web3.eth.subscribe("newHeads")
+                    logger.info(f"Subscribed to new blocks on {network}")
+                    
+                    async for message in ws_web3.socket.process_subscriptions():
+                        number = message["result"]["number"]
+                        block_number = int(number, 16) if isinstance(number, str) else int(number)
+                        self._latest_block[network] = (block_number, time.monotonic())
+                        
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in {network} block subscription: {str(e)}")
+                
+            # Fall back to RPC polling until the subscription is re-established
+            self._latest_block.pop(network, None)
+            await asyncio.sleep(5)
+            
+    async def _liveness_loop(self):
+        """Periodically refresh the cached connection state of each network"""
+        while True:
+            await asyncio.sleep(self.liveness_interval)
+            for network, web3 in self.async_web3_instances.items():
+                try:
+                    self._connected[network] = await web3.is_connected()
+                except Exception:
+                    self._connected[network] = False
+                    
+    async def get_async_web3(self, network: str) -> Optional[AsyncWeb3]:
+        """
+        Get async Web3 instance for a specific network
+        
+        Args:
+            network: Network name
+            
+        Returns:
+            Async Web3 instance or None if not available
+        """
+        if self.async_session is None:
+            await self.initialize_async()
+        return self.async_web3_instances.get(network.upper())
+        
+    async def close(self):
+        """Close the async RPC session and stop its background tasks"""
+        for task in (self._liveness_task, self._prewarm_task, *self._head_tasks):
+            if task is not None:
+                task.cancel()
+        if self.async_session is not None and not self.async_session.closed:
+            await self.async_session.close()
+            
     def get_web3(self, network: str) -> Optional[Web3]:
         """
         Get Web3 instance for a specific network
@@ -74,16 +280,78 @@ class Web3Manager:
         """
         Check if connected to a specific network
         
+        Uses the state cached by the liveness task and the last RPC call
+        instead of making a request.
+        
         Args:
             network: Network name
             
         Returns:
             True if connected, False otherwise
         """
-        web3 = self.get_web3(network)
-        return web3 is not None and web3.is_connected()
+        return self._connected.get(network.upper(), False)
     
-    def get_gas_price(self, network: str) -> Optional[int]:
+    def _record_rpc_result(self, network: str, success: bool):
+        """
+        Update the circuit breaker and connection state after an RPC call
+        
+        Args:
+            network: Network name
+            success: Whether the call succeeded
+        """
+        if success:
+            self._breaker.pop(network, None)
+            self._connected[network] = True
+            return
+            
+        fail_count = self._breaker.get(network, (0, 0.0))[0] + 1
+        open_until = 0.0
+        if fail_count >= self.breaker_threshold:
+            open_until = time.monotonic() + self.breaker_cooldown
+            logger.warning(f"RPC circuit breaker open for {network} for {self.breaker_cooldown:.0f}s")
+        self._breaker[network] = (fail_count, open_until)
+        self._connected[network] = False
+        
+    async def _with_retry(self, network: str, call: Callable[[Web3], Awaitable[Any]],
+                          attempts: int = 3, base: float = 0.05) -> Any:
+        """
+        Run an RPC call with exponential backoff retries
+        
+        While the circuit breaker of the primary endpoint is open the call
+        goes to the fallback endpoint instead.
+        
+        Args:
+            network: Network name
+            call: Coroutine function taking an async Web3 instance
+            attempts: Maximum number of attempts
+            base: Initial backoff delay in seconds
+            
+        Returns:
+            Result of the call
+        """
+        network = network.upper()
+        web3 = await self.get_async_web3(network)
+        
+        use_fallback = self._breaker.get(network, (0, 0.0))[1] > time.monotonic()
+        if use_fallback:
+            web3 = self.fallback_async_web3_instances.get(network)
+        if web3 is None:
+            raise ConnectionError(f"No available RPC endpoint for {network}")
+            
+        for attempt in range(attempts):
+            try:
+                result = await call(web3)
+                if not use_fallback:
+                    self._record_rpc_result(network, True)
+                return result
+            except (aiohttp.ClientError, asyncio.TimeoutError, ConnectionError):
+                if not use_fallback:
+                    self._record_rpc_result(network, False)
+                if attempt == attempts - 1:
+                    raise
+                await asyncio.sleep(base * 2 ** attempt)
+                
+    async def get_gas_price(self, network: str) -> Optional[int]:
         """
         Get current gas price for a network
         
@@ -94,15 +362,12 @@ class Web3Manager:
             Gas price in wei or None if error
         """
         try:
-            web3 = self.get_web3(network)
-            if web3 and web3.is_connected():
-                return web3.eth.gas_price
-            return None
+            return await self._with_retry(network, lambda web3: web3.eth.gas_price)
         except Exception as e:
             logger.error(f"Error getting gas price for {network}: {str(e)}")
             return None
     
-    def get_wallet_balance(self, network: str, address: Optional[str] = None) -> Optional[float]:
+    async def get_wallet_balance(self, network: str, address: Optional[str] = None) -> Optional[float]:
         """
         Get wallet balance in native currency
         
@@ -114,23 +379,19 @@ class Web3Manager:
             Balance in native currency or None if error
         """
         try:
-            web3 = self.get_web3(network)
-            if not web3 or not web3.is_connected():
-                return None
-                
             if address is None:
-                if not self.private_key:
+                if not self.wallet_address:
                     logger.error("No private key provided for wallet balance check")
                     return None
-                from eth_account import Account
-                address = Account.from_key(self.private_key).address
+                address = self.wallet_address
                 
             # Convert address to checksum format if needed
             if not address.startswith('0x'):
                 address = '0x' + address
+            address = _checksum(address)
             
             # Get balance
-            balance_wei = web3.eth.get_balance(address)
+            balance_wei = await self._with_retry(network, lambda web3: web3.eth.get_balance(address))
             
             # Convert wei to ether
             balance_ether = balance_wei / 1e18  # Division by 10^18 (1 ether = 10^18 wei)
@@ -140,7 +401,7 @@ class Web3Manager:
             logger.error(f"Error getting wallet balance for {network}: {str(e)}")
             return None
             
-    def get_block_number(self, network: str) -> Optional[int]:
+    async def get_block_number(self, network: str) -> Optional[int]:
         """
         Get current block number for a network
         
@@ -150,14 +411,52 @@ class Web3Manager:
         Returns:
             Current block number or None if error
         """
+        # Served from the newHeads subscription while it is delivering blocks
+        latest_block = self._latest_block.get(network.upper())
+        if latest_block is not None and time.monotonic() - latest_block[1] < self.head_max_age:
+            return latest_block[0]
+            
         try:
-            web3 = self.get_web3(network)
-            if web3 and web3.is_connected():
-                return web3.eth.block_number
-            return None
+            return await self._with_retry(network, lambda web3: web3.eth.block_number)
         except Exception as e:
             logger.error(f"Error getting block number for {network}: {str(e)}")
             return None
 
-# Create a singleton instance
-web3_manager = Web3Manager()
\ No newline at end of file
+# Singleton instance, created on first use instead of at import
+_instance: Optional[Web3Manager] = None
+_instance_lock = threading.Lock()
+_async_instance_lock = asyncio.Lock()
+
+def get_web3_manager_sync() -> Web3Manager:
+    """
+    Get the shared Web3Manager, connecting to the networks on first use
+    
+    Returns:
+        Web3Manager singleton
+    """
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = Web3Manager()
+    return _instance
+
+async def get_web3_manager() -> Web3Manager:
+    """
+    Get the shared Web3Manager without blocking the event loop
+    
+    Returns:
+        Web3Manager singleton
+    """
+    if _instance is None:
+        async with _async_instance_lock:
+            if _instance is None:
+                # Connecting is blocking I/O, so run it on a worker thread
+                await asyncio.get_running_loop().run_in_executor(None, get_web3_manager_sync)
+    return _instance
+
+def __getattr__(name: str):
+    # Keep `from core.web3_manager import web3_manager` working, lazily
+    if name == "web3_manager":
+        return get_web3_manager_sync()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -1,17 +1,63 @@
 import logging
 import asyncio
 import aiohttp
-import json
 import os
-from typing import Dict, List, Optional, Any
+import time
+import functools
+from typing import Dict, List, Optional, Any, Tuple
 from web3 import Web3
-from abc import ABC, abstractmethod
+from eth_abi import decode as abi_decode
+from utils.json_utils import json_loads, json_dumps_bytes
+from dexs.http_sessions import get_session
+from core.multicall import encode_call
 
 logger = logging.getLogger(__name__)
 
-class DEXInterface(ABC):
+@functools.lru_cache(maxsize=1)
+def get_token_addresses() -> Dict[str, str]:
+    """Token addresses from the TOKEN_ADDRESSES environment variable, parsed once"""
+    try:
+        return json_loads(os.environ.get("TOKEN_ADDRESSES", "{}"))
+    except Exception as e:
+        logger.error(f"Error parsing TOKEN_ADDRESSES: {str(e)}")
+        return {}
+
+def reload_token_addresses():
+    """Re-read TOKEN_ADDRESSES on next use, e.g. after the environment changed"""
+    get_token_addresses.cache_clear()
+
+# Static Uniswap V3 pool query; token addresses are passed as variables
+UNISWAP_V3_POOL_QUERY = (
+    "query($t0:String!,$t1:String!){pools(where:{token0:$t0,token1:$t1},"
+    "orderBy:liquidity,orderDirection:desc,first:1){id token0Price totalValueLockedUSD}}"
+)
+GRAPHQL_HEADERS = {"Accept-Encoding": "gzip", "Content-Type": "application/json"}
+
+# Event topics, hashed once for log filters
+PANCAKESWAP_SWAP_TOPIC = Web3.keccak(text="Swap(address,uint256,uint256,uint256,uint256,address)")
+UNISWAP_V3_SWAP_TOPIC = Web3.keccak(text="Swap(address,address,int256,int256,uint160,uint128,int24)")
+
+# Pool fee tier used for on-chain Uniswap V3 price reads (0.3%)
+UNISWAP_V3_FEE_TIER = 3000
+
+ZERO_ADDRESS = "0x" + "0" * 40
+
+ABI_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "contracts", "abis")
+
+@functools.lru_cache(maxsize=None)
+def _load_abi(name: str) -> List[Dict]:
+    """Load a bundled contract ABI from contracts/abis"""
+    with open(os.path.join(ABI_DIR, f"{name}.json"), 'rb') as f:
+        return json_loads(f.read())
+
+class DEXInterface:
     """Base class for DEX interfaces"""
     
+    __slots__ = (
+        "network", "web3", "router", "factory", "factory_address", "_pools",
+        "min_api_interval", "_sem", "price_cache_ttl", "_price_cache"
+    )
+    
     def __init__(self, network: str, web3_instance):
         """
         Initialize the DEX interface
@@ -20,16 +66,67 @@ class DEXInterface(ABC):
             network: Network name (BSC or POLYGON)
             web3_instance: Web3 instance for the network
         """
+        if type(self) is DEXInterface:
+            raise TypeError("DEXInterface is a base class; use a DEX-specific interface")
+            
         self.network = network
         self.web3 = web3_instance
         
-        # Default API rate limiting
+        # Contract objects built once by load_contract_addresses
+        self.router = None
+        self.factory = None
+        self.factory_address = None
+        
+        # Resolved on-chain pools per token pair:
+        # (pool address, token A is token0, token A decimals, token B decimals), or None if no pool
+        self._pools: Dict[str, Optional[Tuple[str, bool, int, int]]] = {}
+        
+        # Default API rate limit, enforced by the price aggregator's token bucket
         self.min_api_interval = 0.5  # seconds between API calls
         
-    @abstractmethod
+        # Bound in-flight API requests
+        self._sem = asyncio.Semaphore(4)
+        
+        # Recent price results per token pair: (fetch time, price data)
+        self.price_cache_ttl = float(os.environ.get("DEX_PRICE_CACHE_TTL", "1.5"))  # seconds
+        self._price_cache: Dict[str, Tuple[float, Dict]] = {}
+        
     async def get_price(self, token_pair: str) -> Optional[Dict]:
         """
-        Get price data for a token pair
+        Get price data for a token pair, served from cache within the TTL
+        
+        Args:
+            token_pair: Token pair (e.g., "ETH-USDT")
+            
+        Returns:
+            Price data dictionary or None if failed
+        """
+        cached = self._price_cache.get(token_pair)
+        if cached is not None and time.monotonic() - cached[0] < self.price_cache_ttl:
+            return cached[1]
+            
+        async with self._sem:
+            result = await self.fetch_price(token_pair)
+            
+        if result is not None:
+            self._price_cache[token_pair] = (time.monotonic(), result)
+        return result
+        
+    def invalidate(self, token_pair: Optional[str] = None):
+        """
+        Drop cached price data, e.g. after trading against the pool
+        
+        Args:
+            token_pair: Token pair to invalidate, or None for all pairs
+        """
+        if token_pair is None:
+            self._price_cache.clear()
+        else:
+            self._price_cache.pop(token_pair, None)
+            
+    async def fetch_price(self, token_pair: str) -> Optional[Dict]:
+        """
+        Fetch fresh price data for a token pair
         
         Args:
             token_pair: Token pair (e.g., "ETH-USDT")
@@ -37,12 +134,11 @@ class DEXInterface(ABC):
         Returns:
             Price data dictionary or None if failed
         """
-        pass
+        raise NotImplementedError(f"{type(self).__name__} does not implement fetch_price")
         
-    @abstractmethod
     async def get_liquidity(self, token_pair: str) -> Optional[float]:
         """
-        Get liquidity data for a token pair
+        Get liquidity data for a token pair from the cached price data
         
         Args:
             token_pair: Token pair (e.g., "ETH-USDT")
@@ -50,11 +146,138 @@ class DEXInterface(ABC):
         Returns:
             Liquidity in USD or None if failed
         """
-        pass
+        return (await self.get_price(token_pair) or {}).get('liquidity')
+        
+    def _build_contract(self, address: Optional[str], abi_name: str):
+        """
+        Build a contract object for a DEX contract address
+        
+        Args:
+            address: Contract address or None
+            abi_name: Name of the bundled ABI file
+            
+        Returns:
+            Contract object, or None without an address or Web3 instance
+        """
+        if not address or self.web3 is None:
+            return None
+            
+        try:
+            return self.web3.eth.contract(address=Web3.to_checksum_address(address), abi=_load_abi(abi_name))
+        except Exception as e:
+            logger.error(f"Error building {abi_name} contract on {self.network}: {str(e)}")
+            return None
+            
+    def _pair_token_addresses(self, token_pair: str) -> Optional[Tuple[str, str]]:
+        """
+        Get the token addresses of a token pair on this network
+        
+        Args:
+            token_pair: Token pair (e.g., "ETH-USDT")
+            
+        Returns:
+            Tuple of (token A address, token B address) or None if unknown
+        """
+        tokens = token_pair.split('-')
+        if len(tokens) != 2:
+            return None
+            
+        token_addresses = get_token_addresses()
+        token_a_address = token_addresses.get(f"{tokens[0]}_{self.network}")
+        token_b_address = token_addresses.get(f"{tokens[1]}_{self.network}")
+        if not token_a_address or not token_b_address:
+            return None
+        return token_a_address, token_b_address
+        
+    def pool_lookup_call(self, token_a_address: str, token_b_address: str) -> Optional[Tuple[str, bytes]]:
+        """
+        Get the factory call that returns the pool address of a token pair
+        
+        Args:
+            token_a_address: Token A address
+            token_b_address: Token B address
+            
+        Returns:
+            (target, calldata) tuple, or None if on-chain reads are not supported
+        """
+        return None
+        
+    def pool_info_calls(self, token_pair: str) -> List[Tuple[str, bytes]]:
+        """
+        Get the calls that resolve the pool and token decimals of a token pair
+        
+        Args:
+            token_pair: Token pair (e.g., "ETH-USDT")
+            
+        Returns:
+            List of (target, calldata) tuples, empty if already resolved or unsupported
+        """
+        if token_pair in self._pools:
+            return []
+            
+        addresses = self._pair_token_addresses(token_pair)
+        if addresses is None:
+            return []
+            
+        lookup_call = self.pool_lookup_call(*addresses)
+        if lookup_call is None:
+            return []
+            
+        decimals_call = encode_call("decimals()")
+        return [lookup_call, (addresses[0], decimals_call), (addresses[1], decimals_call)]
+        
+    def set_pool_info(self, token_pair: str, results: List[Optional[bytes]]):
+        """
+        Store the pool resolved from the results of pool_info_calls
+        
+        Args:
+            token_pair: Token pair (e.g., "ETH-USDT")
+            results: Return data per call, or None for failed calls
+        """
+        if any(result is None for result in results):
+            return  # Retry on the next read
+            
+        pool_address = abi_decode(['address'], results[0])[0]
+        if pool_address.lower() == ZERO_ADDRESS:
+            self._pools[token_pair] = None
+            return
+            
+        token_a_address, token_b_address = self._pair_token_addresses(token_pair)
+        self._pools[token_pair] = (
+            pool_address,
+            token_a_address.lower() < token_b_address.lower(),
+            abi_decode(['uint8'], results[1])[0],
+            abi_decode(['uint8'], results[2])[0]
+        )
+        
+    def pool_state_call(self, token_pair: str) -> Optional[Tuple[str, bytes]]:
+        """
+        Get the call that reads the current state of a token pair's pool
+        
+        Args:
+            token_pair: Token pair (e.g., "ETH-USDT")
+            
+        Returns:
+            (target, calldata) tuple, or None if the pool is not resolved
+        """
+        return None
+        
+    def price_from_pool_state(self, token_pair: str, return_data: bytes) -> Optional[Dict]:
+        """
+        Decode price data from the result of pool_state_call
+        
+        Args:
+            token_pair: Token pair (e.g., "ETH-USDT")
+            return_data: Return data of the pool state call
+            
+        Returns:
+            Price data dictionary or None if failed
+        """
+        return None
         
     def format_result(self, token_pair: str, price: float, liquidity: float = None) -> Dict:
         """
-        Format price data result
+        Format price data result, stamped with the time it was fetched
         
         Args:
             token_pair: Token pair (e.g., "ETH-USDT")
@@ -67,7 +290,8 @@ class DEXInterface(ABC):
         result = {
             'token_pair': token_pair,
             'price': price,
-            'network': self.network
+            'network': self.network,
+            'timestamp': time.time()
         }
         
         if liquidity is not None:
@@ -75,10 +299,32 @@ class DEXInterface(ABC):
             
         return result
         
+    def format_onchain_result(self, token_pair: str, price: float, liquidity: float = None) -> Dict:
+        """
+        Format price data read from a pool on-chain
+        
+        On-chain prices and liquidity are in token B units rather than USD, so
+        the result is marked with its source and quote unit.
+        
+        Args:
+            token_pair: Token pair (e.g., "ETH-USDT")
+            price: Token A price in token B
+            liquidity: Optional pool liquidity in token B
+            
+        Returns:
+            Formatted price data dictionary
+        """
+        result = self.format_result(token_pair, price, liquidity)
+        result['source'] = 'onchain'
+        result['quote_unit'] = token_pair.split('-')[1]
+        return result
+        
 
 class PancakeSwapInterface(DEXInterface):
     """Interface for PancakeSwap DEX"""
     
+    __slots__ = ("api_url", "router_address")
+    
     def __init__(self, network: str, web3_instance):
         super().__init__(network, web3_instance)
         
@@ -110,9 +356,12 @@ class PancakeSwapInterface(DEXInterface):
         else:
             self.factory_address = None
             
-    async def get_price(self, token_pair: str) -> Optional[Dict]:
+        self.router = self._build_contract(self.router_address, "pancakeswap_router")
+        self.factory = self._build_contract(self.factory_address, "pancakeswap_factory")
+            
+    async def fetch_price(self, token_pair: str) -> Optional[Dict]:
         """
-        Get price data for a token pair from PancakeSwap
+        Fetch price data for a token pair from PancakeSwap
         
         Args:
             token_pair: Token pair (e.g., "ETH-USDT")
@@ -134,24 +383,25 @@ class PancakeSwapInterface(DEXInterface):
             token_a, token_b = tokens
             
             # Try to get price from API first
-            async with aiohttp.ClientSession() as session:
-                # Use API to get price
-                token_addresses = json.loads(os.environ.get("TOKEN_ADDRESSES", "{}"))
-                token_a_address = token_addresses.get(f"{token_a}_BSC")
+            session = await get_session(self.api_url)
+            
+            # Use API to get price
+            token_addresses = get_token_addresses()
+            token_a_address = token_addresses.get(f"{token_a}_BSC")
+            
+            if not token_a_address:
+                logger.warning(f"Token address not found for {token_a} on BSC")
+                return None
                 
-                if not token_a_address:
-                    logger.warning(f"Token address not found for {token_a} on BSC")
-                    return None
-                    
-                # Attempt to get token data from PancakeSwap API
-                async with session.get(f"{self.api_url}/tokens/{token_a_address}") as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if 'data' in data:
-                            price = float(data['data']['price'])
-                            liquidity_usd = float(data['data'].get('liquidity', 0))
-                            return self.format_result(token_pair, price, liquidity_usd)
-                            
+            # Attempt to get token data from PancakeSwap API
+            async with session.get(f"{self.api_url}/tokens/{token_a_address}") as response:
+                if response.status == 200:
+                    data = json_loads(await response.read())
+                    if 'data' in data:
+                        price = float(data['data']['price'])
+                        liquidity_usd = float(data['data'].get('liquidity', 0))
+                        return self.format_result(token_pair, price, liquidity_usd)
+                        
             # If API fails, fall back to on-chain data
             # This would require contract interactions to get reserves and calculate price
             # For simplicity, we'll just return None in this example
@@ -161,29 +411,44 @@ class PancakeSwapInterface(DEXInterface):
         except Exception as e:
             logger.error(f"Error getting price from PancakeSwap: {str(e)}")
             return None
-            
-    async def get_liquidity(self, token_pair: str) -> Optional[float]:
-        """
-        Get liquidity data for a token pair from PancakeSwap
+
+    def pool_lookup_call(self, token_a_address: str, token_b_address: str) -> Optional[Tuple[str, bytes]]:
+        """Get the factory getPair call for a token pair"""
+        if not self.factory_address:
+            return None
+        return self.factory_address, encode_call(
+            "getPair(address,address)", ['address', 'address'], [token_a_address, token_b_address]
+        )
         
-        Args:
-            token_pair: Token pair (e.g., "ETH-USDT")
+    def pool_state_call(self, token_pair: str) -> Optional[Tuple[str, bytes]]:
+        """Get the getReserves call for a token pair's pool"""
+        pool = self._pools.get(token_pair)
+        return (pool[0], encode_call("getReserves()")) if pool else None
+        
+    def price_from_pool_state(self, token_pair: str, return_data: bytes) -> Optional[Dict]:
+        """Calculate the token A price in token B from the pool reserves"""
+        _, a_is_token0, decimals_a, decimals_b = self._pools[token_pair]
+        reserve0, reserve1, _ = abi_decode(['uint112', 'uint112', 'uint32'], return_data)
+        reserve_a, reserve_b = (reserve0, reserve1) if a_is_token0 else (reserve1, reserve0)
+        if reserve_a == 0:
+            return None
             
-        Returns:
-            Liquidity in USD or None if failed
-        """
-        # Similar implementation to get_price, but we only need the liquidity value
-        result = await self.get_price(token_pair)
-        return result.get('liquidity') if result else None
+        # Both sides of the pool valued in token B
+        amount_b = reserve_b / 10 ** decimals_b
+        price = amount_b / (reserve_a / 10 ** decimals_a)
+        return self.format_onchain_result(token_pair, price, 2 * amount_b)
 
 
 class UniswapV3Interface(DEXInterface):
     """Interface for Uniswap V3 DEX"""
     
+    __slots__ = ("api_url", "router_address", "quoter_address", "quoter")
+    
     def __init__(self, network: str, web3_instance):
         super().__init__(network, web3_instance)
         
         # Uniswap V3 specific settings
+        self.api_url = "https://api.thegraph.com/subgraphs/name/uniswap/uniswap-v3"
         self.min_api_interval = 0.5
         
         # Load contract addresses
@@ -215,9 +480,13 @@ class UniswapV3Interface(DEXInterface):
         else:
             self.factory_address = None
             
-    async def get_price(self, token_pair: str) -> Optional[Dict]:
+        self.router = self._build_contract(self.router_address, "uniswap_v3_router")
+        self.quoter = self._build_contract(self.quoter_address, "uniswap_v3_quoter")
+        self.factory = self._build_contract(self.factory_address, "uniswap_v3_factory")
+            
+    async def fetch_price(self, token_pair: str) -> Optional[Dict]:
         """
-        Get price data for a token pair from Uniswap V3
+        Fetch price data for a token pair from Uniswap V3
         
         Args:
             token_pair: Token pair (e.g., "ETH-USDT")
@@ -240,66 +509,67 @@ class UniswapV3Interface(DEXInterface):
             
             # Uniswap V3 has a Graph API that we can use
             # For this example, we'll use a simplified approach with The Graph API
-            async with aiohttp.ClientSession() as session:
-                graphql_url = "https://api.thegraph.com/subgraphs/name/uniswap/uniswap-v3"
-                
-                # Get token addresses
-                token_addresses = json.loads(os.environ.get("TOKEN_ADDRESSES", "{}"))
-                token_a_address = token_addresses.get(f"{token_a}_POLYGON")
-                token_b_address = token_addresses.get(f"{token_b}_POLYGON")
+            session = await get_session(self.api_url)
+            
+            # Get token addresses
+            token_addresses = get_token_addresses()
+            token_a_address = token_addresses.get(f"{token_a}_POLYGON")
+            token_b_address = token_addresses.get(f"{token_b}_POLYGON")
+            
+            if not token_a_address or not token_b_address:
+                logger.warning(f"Token addresses not found for {token_pair} on POLYGON")
+                return None
                 
-                if not token_a_address or not token_b_address:
-                    logger.warning(f"Token addresses not found for {token_pair} on POLYGON")
-                    return None
+            # GraphQL query for pool data
+            query = {
+                "query": UNISWAP_V3_POOL_QUERY,
+                "variables": {"t0": token_a_address.lower(), "t1": token_b_address.lower()}
+            }
+            
+            async with session.post(self.api_url, data=json_dumps_bytes(query), headers=GRAPHQL_HEADERS) as response:
+                if response.status == 200:
+                    data = json_loads(await response.read())
+                    pools = data.get('data', {}).get('pools', [])
                     
-                # GraphQL query for pool data
-                query = {
-                    "query": f"""
-                    {{
-                      pools(where: {{
-                        token0: "{token_a_address.lower()}", 
-                        token1: "{token_b_address.lower()}"
-                      }}, orderBy: liquidity, orderDirection: desc, first: 1) {{
-                        id
-                        token0Price
-                        token1Price
-                        liquidity
-                        totalValueLockedUSD
-                      }}
-                    }}
-                    """
-                }
-                
-                async with session.post(graphql_url, json=query) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        pools = data.get('data', {}).get('pools', [])
+                    if pools and len(pools) > 0:
+                        pool = pools[0]
+                        price = float(pool['token0Price'])
+                        liquidity_usd = float(pool['totalValueLockedUSD'])
+                        return self.format_result(token_pair, price, liquidity_usd)
                         
-                        if pools and len(pools) > 0:
-                            pool = pools[0]
-                            price = float(pool['token0Price'])
-                            liquidity_usd = float(pool['totalValueLockedUSD'])
-                            return self.format_result(token_pair, price, liquidity_usd)
-                            
             logger.warning(f"Failed to get {token_pair} price from Uniswap V3 GraphQL API")
             return None
             
         except Exception as e:
             logger.error(f"Error getting price from Uniswap V3: {str(e)}")
             return None
-            
-    async def get_liquidity(self, token_pair: str) -> Optional[float]:
-        """
-        Get liquidity data for a token pair from Uniswap V3
+
+    def pool_lookup_call(self, token_a_address: str, token_b_address: str) -> Optional[Tuple[str, bytes]]:
+        """Get the factory getPool call for a token pair at the default fee tier"""
+        if not self.factory_address:
+            return None
+        return self.factory_address, encode_call(
+            "getPool(address,address,uint24)", ['address', 'address', 'uint24'],
+            [token_a_address, token_b_address, UNISWAP_V3_FEE_TIER]
+        )
         
-        Args:
-            token_pair: Token pair (e.g., "ETH-USDT")
+    def pool_state_call(self, token_pair: str) -> Optional[Tuple[str, bytes]]:
+        """Get the slot0 call for a token pair's pool"""
+        pool = self._pools.get(token_pair)
+        return (pool[0], encode_call("slot0()")) if pool else None
+        
+    def price_from_pool_state(self, token_pair: str, return_data: bytes) -> Optional[Dict]:
+        """Calculate the token A price in token B from the pool's sqrtPriceX96"""
+        _, a_is_token0, decimals_a, decimals_b = self._pools[token_pair]
+        sqrt_price_x96 = abi_decode(['uint160'], return_data[:32])[0]
+        if sqrt_price_x96 == 0:
+            return None
             
-        Returns:
-            Liquidity in USD or None if failed
-        """
-        result = await self.get_price(token_pair)
-        return result.get('liquidity') if result else None
+        # slot0 prices token0 in token1 units
+        decimals_0, decimals_1 = (decimals_a, decimals_b) if a_is_token0 else (decimals_b, decimals_a)
+        price_0_in_1 = (sqrt_price_x96 / 2 ** 96) ** 2 * 10 ** (decimals_0 - decimals_1)
+        price = price_0_in_1 if a_is_token0 else 1 / price_0_in_1
+        return self.format_onchain_result(token_pair, price)
 
 
 # Factory function to create DEX interfaces
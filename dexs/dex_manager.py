@@ -1,12 +1,41 @@
 import logging
 import asyncio
-from typing import Dict, List, Optional, Any
+import sys
+import time
+from typing import Dict, List, Optional, Any, Tuple
+from web3 import Web3
 import config
 from dexs.dex_interfaces import create_dex_interface, DEXInterface
-from core.web3_manager import web3_manager
+from core.web3_manager import get_web3_manager, get_web3_manager_sync
+from dexs.http_sessions import close_sessions, prewarm
+from core.multicall import try_aggregate
 
 logger = logging.getLogger(__name__)
 
+# Price polling is expected to run on the uvloop event loop created in
+# main.create_event_loop; the asyncio loop is only a fallback
+
+# DEX interfaces already created, keyed by (DEX name, network, Web3 instance id)
+_interface_cache: Dict[tuple, DEXInterface] = {}
+
+def get_dex_interface_instance(dex_name: str, network: str, web3_instance) -> DEXInterface:
+    """
+    Create a DEX interface, or reuse the one built for the same Web3 instance
+    
+    Args:
+        dex_name: DEX name
+        network: Network name
+        web3_instance: Web3 instance for the network
+        
+    Returns:
+        DEX interface instance
+    """
+    key = (dex_name, network, id(web3_instance))
+    dex_interface = _interface_cache.get(key)
+    if dex_interface is None or dex_interface.web3 is not web3_instance:
+        dex_interface = _interface_cache[key] = create_dex_interface(dex_name, network, web3_instance)
+    return dex_interface
+
 class DEXManager:
     """
     Manages DEX interfaces and provides unified access to price data
@@ -14,16 +43,33 @@ class DEXManager:
     
     def __init__(self):
         """Initialize the DEXManager"""
-        self.dex_interfaces = {}
+        # (DEX name, network) -> DEX interface
+        self.dex_interfaces: Dict[Tuple[str, str], DEXInterface] = {}
+        
+        # Last get_all_prices results per token pair: (fetch time, results)
+        self.all_prices_ttl = 1.5  # seconds
+        self._last_all_prices: Dict[str, tuple] = {}
+        
         self._initialize_dexs()
         
+    @classmethod
+    async def create(cls) -> 'DEXManager':
+        """
+        Create a DEXManager after connecting to the networks off the event loop
+        
+        Returns:
+            New DEXManager
+        """
+        await get_web3_manager()
+        return cls()
+        
     def _initialize_dexs(self):
         """Initialize DEX interfaces for all configured networks and DEXs"""
         for network, network_config in config.NETWORK_CONFIG.items():
             if not network_config.get("enabled", False):
                 continue
                 
-            web3_instance = web3_manager.get_web3(network)
+            web3_instance = get_web3_manager_sync().get_web3(network)
             if not web3_instance:
                 logger.warning(f"No Web3 instance for {network}, skipping DEX initialization")
                 continue
@@ -33,9 +79,9 @@ class DEXManager:
             
             for dex_name in enabled_dexs:
                 try:
-                    dex_interface = create_dex_interface(dex_name, network, web3_instance)
+                    dex_interface = get_dex_interface_instance(dex_name, network, web3_instance)
                     
-                    key = f"{dex_name}_{network}"
+                    key = (sys.intern(dex_name.upper()), sys.intern(network.upper()))
                     self.dex_interfaces[key] = dex_interface
                     
                     logger.info(f"Initialized {dex_name} interface for {network}")
@@ -53,8 +99,7 @@ class DEXManager:
         Returns:
             DEX interface or None if not available
         """
-        key = f"{dex_name}_{network}"
-        return self.dex_interfaces.get(key)
+        return self.dex_interfaces.get((dex_name.upper(), network.upper()))
         
     async def get_price(self, token_pair: str, dex_name: str, network: str) -> Optional[Dict]:
         """
@@ -73,7 +118,12 @@ class DEXManager:
             logger.warning(f"No interface found for {dex_name} on {network}")
             return None
             
-        return await dex_interface.get_price(token_pair)
+        price_data = await dex_interface.get_price(token_pair)
+        if price_data is None:
+            # API failed, read the pool on-chain instead
+            onchain = await self._onchain_prices(network.upper(), [(dex_name.upper(), token_pair)])
+            price_data = onchain.get((dex_name.upper(), token_pair))
+        return price_data
         
     async def get_liquidity(self, token_pair: str, dex_name: str, network: str) -> Optional[float]:
         """
@@ -87,6 +137,13 @@ class DEXManager:
         Returns:
             Liquidity in USD or None if failed
         """
+        # Reuse a recent get_all_prices result before asking the DEX interface
+        cached = self._last_all_prices.get(token_pair)
+        if cached is not None and time.monotonic() - cached[0] < self.all_prices_ttl:
+            for price_data in cached[1]:
+                if price_data['dex_name'] == dex_name.upper() and price_data['network'] == network.upper():
+                    return price_data.get('liquidity')
+                    
         dex_interface = self.get_dex_interface(dex_name, network)
         if not dex_interface:
             logger.warning(f"No interface found for {dex_name} on {network}")
@@ -104,26 +161,139 @@ class DEXManager:
         Returns:
             List of price data dictionaries
         """
-        tasks = []
+        async def tagged(dex_name: str, network: str, dex_interface: DEXInterface):
+            try:
+                return dex_name, network, await dex_interface.get_price(token_pair)
+            except Exception as e:
+                return dex_name, network, e
+                
+        tasks = [
+            asyncio.create_task(tagged(dex_name, network, dex_interface))
+            for (dex_name, network), dex_interface in self.dex_interfaces.items()
+        ]
         
-        for key, dex_interface in self.dex_interfaces.items():
-            dex_name, network = key.split('_')
-            task = asyncio.create_task(dex_interface.get_price(token_pair))
-            tasks.append((dex_name, network, task))
-            
         results = []
+        failed: Dict[str, List[Tuple[str, str]]] = {}
         
-        for dex_name, network, task in tasks:
-            try:
-                price_data = await task
-                if price_data:
+        # Handle quotes in arrival order so one slow API does not hold up the others
+        for next_result in asyncio.as_completed(tasks):
+            dex_name, network, price_data = await next_result
+            
+            if isinstance(price_data, Exception):
+                logger.error(f"Error getting price from {dex_name} on {network}: {str(price_data)}")
+                failed.setdefault(network, []).append((dex_name, token_pair))
+            elif price_data:
+                price_data['dex_name'] = dex_name
+                results.append(price_data)
+            else:
+                failed.setdefault(network, []).append((dex_name, token_pair))
+                
+        # Read the pools of DEXs whose API failed on-chain, one multicall per network
+        if failed:
+            onchain_results = await asyncio.gather(*(
+                self._onchain_prices(network, requests) for network, requests in failed.items()
+            ))
+            for onchain in onchain_results:
+                for (dex_name, _), price_data in onchain.items():
                     price_data['dex_name'] = dex_name
                     results.append(price_data)
+                    
+        self._last_all_prices[token_pair] = (time.monotonic(), results)
+        return results
+        
+    async def prewarm(self):
+        """Resolve and connect to every DEX API host ahead of the first price request"""
+        await prewarm(getattr(dex_interface, 'api_url', None) for dex_interface in self.dex_interfaces.values())
+        
+    async def multicall(self, network: str, calls: List[Tuple[str, bytes]]) -> List[Optional[bytes]]:
+        """
+        Execute read-only contract calls on one network in a single round trip
+        
+        Falls back to one eth_call per request if the multicall fails.
+        
+        Args:
+            network: Network name
+            calls: List of (target address, calldata) tuples
+            
+        Returns:
+            Return data per call, or None for calls that failed
+        """
+        web3 = await (await get_web3_manager()).get_async_web3(network)
+        if not web3 or not calls:
+            return [None] * len(calls)
+            
+        results = await try_aggregate(web3, network, calls)
+        if results is not None:
+            return [return_data if success else None for success, return_data in results]
+            
+        async def single_call(target: str, call_data: bytes) -> Optional[bytes]:
+            try:
+                return bytes(await web3.eth.call({'to': Web3.to_checksum_address(target), 'data': call_data}))
             except Exception as e:
-                logger.error(f"Error getting price from {dex_name} on {network}: {str(e)}")
+                logger.debug(f"eth_call to {target} on {network} failed: {str(e)}")
+                return None
                 
-        return results
+        return list(await asyncio.gather(*(single_call(target, data) for target, data in calls)))
+        
+    async def _onchain_prices(self, network: str, requests: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Dict]:
+        """
+        Read pool prices on-chain for several DEXs and token pairs on one network
+        
+        Unresolved pools are looked up first (factory address and token
+        decimals, cached afterwards); then all pool states are read with a
+        single multicall.
+        
+        Args:
+            network: Network name
+            requests: List of (DEX name, token pair) tuples
+            
+        Returns:
+            Dictionary mapping (DEX name, token pair) to price data
+        """
+        interfaces = [
+            (dex_name, token_pair, self.dex_interfaces.get((dex_name, network)))
+            for dex_name, token_pair in requests
+        ]
+        interfaces = [item for item in interfaces if item[2] is not None]
         
+        try:
+            # Resolve pools that have not been looked up yet
+            lookups = [
+                (dex_interface, token_pair, dex_interface.pool_info_calls(token_pair))
+                for _, token_pair, dex_interface in interfaces
+            ]
+            lookups = [lookup for lookup in lookups if lookup[2]]
+            if lookups:
+                results = await self.multicall(network, [call for _, _, calls in lookups for call in calls])
+                offset = 0
+                for dex_interface, token_pair, calls in lookups:
+                    dex_interface.set_pool_info(token_pair, results[offset:offset + len(calls)])
+                    offset += len(calls)
+                    
+            # Read every resolved pool in one round trip
+            reads = []
+            for dex_name, token_pair, dex_interface in interfaces:
+                call = dex_interface.pool_state_call(token_pair)
+                if call is not None:
+                    reads.append((dex_name, token_pair, dex_interface, call))
+            if not reads:
+                return {}
+                
+            results = await self.multicall(network, [call for _, _, _, call in reads])
+            
+            prices = {}
+            for (dex_name, token_pair, dex_interface, _), return_data in zip(reads, results):
+                if return_data is None:
+                    continue
+                price_data = dex_interface.price_from_pool_state(token_pair, return_data)
+                if price_data is not None:
+                    prices[(dex_name, token_pair)] = price_data
+            return prices
+            
+        except Exception as e:
+            logger.error(f"Error reading on-chain prices on {network}: {str(e)}")
+            return {}
+            
     def get_supported_token_pairs(self) -> List[str]:
         """
         Get list of supported token pairs
@@ -142,15 +312,41 @@ class DEXManager:
         """
         result = {}
         
-        for key in self.dex_interfaces:
-            dex_name, network = key.split('_')
-            
+        for dex_name, network in self.dex_interfaces:
             if network not in result:
                 result[network] = []
                 
             result[network].append(dex_name)
             
         return result
+        
+    async def close(self):
+        """Close the HTTP sessions shared by the DEX interfaces"""
+        await close_sessions()
+        
+    async def __aenter__(self):
+        return self
+        
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+# Singleton instance, created on first use instead of at import
+_dex_manager: Optional[DEXManager] = None
+
+def get_dex_manager() -> DEXManager:
+    """
+    Get the shared DEXManager
+    
+    Returns:
+        DEXManager singleton
+    """
+    global _dex_manager
+    if _dex_manager is None:
+        _dex_manager = DEXManager()
+    return _dex_manager
 
-# Create a singleton instance
-dex_manager = DEXManager()
\ No newline at end of file
+def __getattr__(name: str):
+    # Keep `from dexs.dex_manager import dex_manager` working, lazily
+    if name == "dex_manager":
+        return get_dex_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
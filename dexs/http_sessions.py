@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import os
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlparse
+import aiohttp
+
+try:
+    import aiodns  # noqa: F401 - required by aiohttp.AsyncResolver
+    AIODNS_AVAILABLE = True
+except ImportError:
+    AIODNS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# One keep-alive session per API host, shared by every DEX interface
+_sessions: Dict[str, aiohttp.ClientSession] = {}
+
+# Optional comma-separated resolver override, e.g. "1.1.1.1,8.8.8.8"
+DNS_NAMESERVERS = [ns.strip() for ns in os.environ.get("DNS_NAMESERVERS", "").split(",") if ns.strip()]
+DNS_CACHE_TTL = 600  # seconds
+
+
+def create_connector(**kwargs) -> aiohttp.TCPConnector:
+    """
+    Create a TCP connector with a long-lived DNS cache
+    
+    Resolves names asynchronously through aiodns when it is installed, and
+    with the default threaded resolver otherwise. The system resolver
+    configuration is used unless DNS_NAMESERVERS is set.
+    
+    Args:
+        **kwargs: Extra TCPConnector arguments (limits, keep-alive)
+        
+    Returns:
+        New TCP connector
+    """
+    if AIODNS_AVAILABLE and "resolver" not in kwargs:
+        if DNS_NAMESERVERS:
+            kwargs["resolver"] = aiohttp.AsyncResolver(nameservers=DNS_NAMESERVERS)
+        else:
+            kwargs["resolver"] = aiohttp.AsyncResolver()
+    kwargs.setdefault("ttl_dns_cache", DNS_CACHE_TTL)
+    return aiohttp.TCPConnector(**kwargs)
+
+
+async def get_session(url: str) -> aiohttp.ClientSession:
+    """
+    Get the shared HTTP session for the host of a URL
+
+    Args:
+        url: Request URL
+
+    Returns:
+        Pooled aiohttp session for the URL's host
+    """
+    host = urlparse(url).netloc
+    session = _sessions.get(host)
+    if session is None or session.closed:
+        connector = create_connector(
+            limit=200, limit_per_host=64, keepalive_timeout=60, force_close=False, enable_cleanup_closed=True
+        )
+        session = _sessions[host] = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=10)
+        )
+    return session
+
+
+async def prewarm(urls: Iterable[str], session: Optional[aiohttp.ClientSession] = None):
+    """
+    Resolve and connect to endpoints ahead of their first real request
+    
+    Args:
+        urls: Endpoint URLs
+        session: Session to warm, or None to use each host's shared session
+    """
+    async def warm(url: str):
+        try:
+            target = session or await get_session(url)
+            async with target.head(url, allow_redirects=False):
+                pass
+        except Exception as e:
+            logger.debug(f"Pre-warming {url} failed: {str(e)}")
+            
+    await asyncio.gather(*(warm(url) for url in set(urls) if url))
+
+
+async def close_sessions():
+    """Close all shared HTTP sessions"""
+    for host, session in list(_sessions.items()):
+        try:
+            if not session.closed:
+                await session.close()
+        except Exception as e:
+            logger.error(f"Error closing HTTP session for {host}: {str(e)}")
+    _sessions.clear()
@@ -1,15 +1,18 @@
 import logging
 import asyncio
+import functools
+import random
 import time
 import aiohttp
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor
 import os
-import json
 from web3 import Web3
 from models import TokenPrice, db
 from datetime import datetime
 import config
-from dexs.dex_manager import dex_manager
+from dexs.dex_manager import get_dex_manager
+from dexs import dex_interfaces
 
 logger = logging.getLogger(__name__)
 
@@ -26,69 +29,294 @@ class PriceAggregator:
         # Initialize token list from config
         self.token_list = config.TRADING_CONFIG.get("token_pairs", [])
         
-        # Cached price data
-        self.price_cache = {}
-        self.last_update = 0
-        self.update_interval = int(os.environ.get("PRICE_UPDATE_INTERVAL_MS", "1000"))
+        # Cached price data keyed by (token pair, DEX name, network), also
+        # indexed by token pair and then (DEX name, network)
+        self.price_cache: Dict[Tuple[str, str, str], Dict] = {}
+        self.pair_prices: Dict[str, Dict[Tuple[str, str], Dict]] = {}
         
-        # Semaphore to limit concurrent API calls
-        self.api_semaphore = asyncio.Semaphore(50)
+        # Monotonic expiry time per cached price; expired prices are skipped by
+        # readers and removed by a sweeper running every price_cache_ttl / 2
+        self.price_cache_ttl = float(os.environ.get("PRICE_CACHE_TTL_SEC", "10"))
+        self._price_expiry: Dict[Tuple[str, str, str], float] = {}
+        self._sweep_task: Optional[asyncio.Task] = None
         
-        # Rate limiting settings
-        self.rate_limits = {}
+        # (DEX name, network, token pair) fetched by each refresh, built on first
+        # use and rotated by one token pair per refresh, so pairs skipped by a
+        # DEX's rate limit are fetched first on a later refresh
+        self._plan: Optional[List[Tuple[str, str, str]]] = None
+        self._plan_offset = 0
+        
+        # Queues notified with the token pairs updated by each refresh
+        self.subscribers: List[asyncio.Queue] = []
+        self.last_update = float('-inf')  # monotonic time of the last refresh
+        self.update_interval_s = int(os.environ.get("PRICE_UPDATE_INTERVAL_MS", "1000")) / 1000.0
+        self.fetch_deadline_s = self.update_interval_s * 0.9
+        
+        # Semaphore to limit concurrent price fetches
+        self.max_concurrent_fetches = int(os.environ.get("MAX_CONCURRENT_PRICE_FETCH", "50"))
+        self.api_semaphore = asyncio.Semaphore(self.max_concurrent_fetches)
+        
+        # Token bucket per DEX and network: refilled at 1 / min_api_interval
+        # tokens per second, holding up to rate_limit_burst tokens. Fetches
+        # that would wait over half an update interval are skipped for the tick
+        self.rate_limit_burst = float(os.environ.get("DEX_RATE_LIMIT_BURST", "5"))
+        self.buckets: Dict[str, dict] = {}
+        self.rate_limited: Dict[str, int] = {}  # fetches skipped per DEX and network
+        
+        # Parsed token pairs, reused across saves
+        self._pair_split_cache: Dict[str, tuple] = {}
+        
+        # Price batches waiting to be written by the background DB writer,
+        # which coalesces up to db_write_batch_limit batches per transaction.
+        # When the DB falls behind the oldest queued batch is dropped. stop()
+        # waits up to db_flush_timeout_s for queued batches to be written
+        self.db_write_batch_limit = 10
+        self.db_flush_timeout_s = float(os.environ.get("DB_FLUSH_TIMEOUT_SEC", "5"))
+        self._write_q: asyncio.Queue = asyncio.Queue(maxsize=int(os.environ.get("DB_WRITE_QUEUE_SIZE", "100")))
+        self._writer_task: Optional[asyncio.Task] = None
+        self._db_executor: Optional[ThreadPoolExecutor] = None
+        
+        # Flask app for DB writes, imported on first save to avoid an import cycle
+        self._app = None
+        
+    def reload_token_addresses(self):
+        """Re-read the TOKEN_ADDRESSES mapping, e.g. after the environment changed"""
+        dex_interfaces.reload_token_addresses()
+            
+    def _split_pair(self, token_pair: str) -> tuple:
+        """
+        Split a token pair into its tokens, caching the result
+        
+        Args:
+            token_pair: Token pair (e.g., "ETH-USDT")
+            
+        Returns:
+            Tuple of token symbols
+        """
+        tokens = self._pair_split_cache.get(token_pair)
+        if tokens is None:
+            tokens = self._pair_split_cache[token_pair] = tuple(token_pair.split('-'))
+        return tokens
         
     async def start(self):
         """Start the price aggregation process"""
         logger.info("Starting price aggregation service")
         
+        self._start_db_writer()
+        if self._sweep_task is None or self._sweep_task.done():
+            self._sweep_task = asyncio.create_task(self._sweep_loop())
+            
         try:
             while True:
                 await self.update_prices()
-                await asyncio.sleep(self.update_interval / 1000)  # Convert ms to seconds
+                await asyncio.sleep(self.update_interval_s)
         except Exception as e:
             logger.error(f"Error in price aggregation service: {str(e)}")
             raise
+        finally:
+            await self.stop()
+            
+    async def stop(self):
+        """Flush and stop the DB writer and close the pooled HTTP sessions shared by the DEX interfaces"""
+        if self._sweep_task is not None:
+            self._sweep_task.cancel()
+        self._sweep_task = None
+        
+        # Give queued price batches a bounded chance to reach the DB
+        if not self._write_q.empty():
+            self._start_db_writer()
+            try:
+                await asyncio.wait_for(self._write_q.join(), timeout=self.db_flush_timeout_s)
+            except asyncio.TimeoutError:
+                logger.warning(f"Dropped {self._write_q.qsize()} price batches not written within {self.db_flush_timeout_s}s")
+                
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+        self._writer_task = None
+        
+        # Wait for a write still running on the DB thread
+        if self._db_executor is not None:
+            executor, self._db_executor = self._db_executor, None
+            await asyncio.get_running_loop().run_in_executor(None, functools.partial(executor.shutdown, wait=True))
+            
+        try:
+            await get_dex_manager().close()
+        except Exception as e:
+            logger.error(f"Error closing DEX sessions: {str(e)}")
             
     async def update_prices(self):
         """Update price data from all DEXs"""
         # Skip if update interval hasn't elapsed
-        current_time = time.time() * 1000  # Convert to ms
-        if current_time - self.last_update < self.update_interval:
+        now = time.monotonic()
+        if now - self.last_update < self.update_interval_s:
             return
             
-        self.last_update = current_time
-        
-        # Get available DEXs from the DEX manager
-        available_dexs = dex_manager.get_available_dexs()
+        self.last_update = now
         
         # Create tasks for all price fetching operations
-        tasks = []
-        for network, dex_names in available_dexs.items():
-            for dex_name in dex_names:
-                for token_pair in self.token_list:
-                    tasks.append(self.get_price_with_retry(dex_name, network, token_pair))
-                
-        # Execute all tasks concurrently
-        try:
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+        tasks = [
+            asyncio.create_task(self._fetch_price(dex_name, network, token_pair))
+            for dex_name, network, token_pair in self._get_plan()
+        ]
+        if not tasks:
+            return
             
+        # Execute all tasks, at most max_concurrent_fetches at a time, and
+        # cancel the fetches still running at the tick deadline
+        try:
+            done, pending = await asyncio.wait(tasks, timeout=self.fetch_deadline_s)
+            for task in pending:
+                task.cancel()
+                
+            if pending:
+                logger.debug(f"Cancelled {len(pending)} price fetches that missed the tick deadline")
+                
             # Filter out exceptions and failed results
-            valid_results = [r for r in results if not isinstance(r, Exception) and r is not None]
-            
-            # Update price cache
+            valid_results = []
+            for task in done:
+                if task.exception() is not None:
+                    logger.error(f"Error in price fetch task: {str(task.exception())}")
+                elif task.result() is not None:
+                    valid_results.append(task.result())
+                    
+            # Update price cache; results served from a DEX interface's cache
+            # are the dicts already cached here and are not persisted again
+            updated_pairs = set()
+            new_results = []
+            expiry = time.monotonic() + self.price_cache_ttl
             for result in valid_results:
-                cache_key = f"{result['token_pair']}_{result['dex_name']}_{result['network']}"
-                self.price_cache[cache_key] = result
+                token_pair, dex_name, network = result['token_pair'], result['dex_name'], result['network']
+                if self.price_cache.get((token_pair, dex_name, network)) is not result:
+                    new_results.append(result)
+                self.price_cache[(token_pair, dex_name, network)] = result
+                self._price_expiry[(token_pair, dex_name, network)] = expiry
+                self.pair_prices.setdefault(token_pair, {})[(dex_name, network)] = result
+                updated_pairs.add(token_pair)
+                
+            # Notify subscribers of the refreshed token pairs
+            if updated_pairs:
+                for queue in self.subscribers:
+                    queue.put_nowait(updated_pairs)
                 
-            # Save to database
-            await self.save_prices_to_db(valid_results)
+            # Hand the results to the DB writer; the tick never waits for the write
+            self.queue_prices_for_db(new_results)
             
             logger.debug(f"Updated prices for {len(valid_results)} token pairs")
             
         except Exception as e:
             logger.error(f"Error updating prices: {str(e)}")
             
-    async def get_price_with_retry(self, dex_name: str, network: str, token_pair: str) -> Optional[Dict]:
+    def _get_plan(self) -> List[Tuple[str, str, str]]:
+        """
+        Get the price fetches to run on this refresh, starting one token pair
+        later than the previous refresh
+        
+        Returns:
+            List of (DEX name, network, token pair) tuples
+        """
+        dex_keys = get_dex_manager().dex_interfaces
+        if self._plan is None:
+            self._plan = [
+                (dex_name, network, token_pair)
+                for token_pair in self.token_list
+                for dex_name, network in dex_keys
+            ]
+            self._plan_offset = 0
+        if not self._plan:
+            return self._plan
+            
+        offset = self._plan_offset
+        self._plan_offset = (offset + len(dex_keys)) % len(self._plan)
+        return self._plan[offset:] + self._plan[:offset]
+        
+    def invalidate_plan(self):
+        """Rebuild the fetch plan on the next refresh, e.g. after the DEX or token list changed"""
+        self._plan = None
+        
+    def subscribe(self) -> asyncio.Queue:
+        """
+        Subscribe to price updates
+        
+        Returns:
+            Queue that receives the set of updated token pairs after each refresh
+        """
+        queue = asyncio.Queue()
+        self.subscribers.append(queue)
+        return queue
+        
+    def get_prices_for(self, token_pairs) -> List[Dict]:
+        """
+        Get cached price data for specific token pairs
+        
+        Args:
+            token_pairs: Token pairs (e.g., {"ETH-USDT"})
+            
+        Returns:
+            List of cached price data dictionaries for those pairs
+        """
+        return [price_data for token_pair in token_pairs for price_data in self._live_pair_prices(token_pair)]
+        
+    def iter_latest_prices(self):
+        """
+        Iterate over the cached prices that have not expired, without copying the cache
+        
+        Yields:
+            Price data dictionaries
+        """
+        now = time.monotonic()
+        expiry = self._price_expiry
+        for key, price_data in self.price_cache.items():
+            if expiry.get(key, 0) > now:
+                yield price_data
+        
+    def _live_pair_prices(self, token_pair: str) -> List[Dict]:
+        """
+        Get the cached prices of a token pair that have not expired
+        
+        Args:
+            token_pair: Token pair (e.g., "ETH-USDT")
+            
+        Returns:
+            List of price data dictionaries
+        """
+        now = time.monotonic()
+        expiry = self._price_expiry
+        return [
+            price_data
+            for (dex_name, network), price_data in self.pair_prices.get(token_pair, {}).items()
+            if expiry.get((token_pair, dex_name, network), 0) > now
+        ]
+        
+    async def _sweep_loop(self):
+        """Periodically remove expired prices from the cache"""
+        while True:
+            await asyncio.sleep(self.price_cache_ttl / 2)
+            try:
+                self._sweep_expired()
+            except Exception as e:
+                logger.error(f"Error sweeping price cache: {str(e)}")
+                
+    def _sweep_expired(self):
+        """Remove expired prices from the cache and the token pair index"""
+        now = time.monotonic()
+        expired = [key for key, expiry in self._price_expiry.items() if expiry <= now]
+        
+        for key in expired:
+            token_pair, dex_name, network = key
+            del self._price_expiry[key]
+            self.price_cache.pop(key, None)
+            
+            pair_entries = self.pair_prices.get(token_pair)
+            if pair_entries is not None:
+                pair_entries.pop((dex_name, network), None)
+                if not pair_entries:
+                    del self.pair_prices[token_pair]
+                    
+        if expired:
+            logger.debug(f"Removed {len(expired)} expired prices from the cache")
+        
+    async def get_price_with_retry(self, dex_name: str, network: str, token_pair: str,
+                                   max_retries: int = 3) -> Optional[Dict]:
         """
         Get price data with retry logic
         
@@ -96,106 +324,243 @@ class PriceAggregator:
             dex_name: DEX name
             network: Network name (BSC or POLYGON)
             token_pair: Token pair (e.g., "ETH-USDT")
+            max_retries: Number of attempts
             
         Returns:
             Price data dictionary or None if failed
         """
-        max_retries = 3
         base_delay = 1.0
         
-        # Apply rate limiting
-        rate_limit_key = f"{dex_name}_{network}"
-        if rate_limit_key in self.rate_limits:
-            last_call, min_interval = self.rate_limits[rate_limit_key]
-            time_since_last = time.time() - last_call
-            if time_since_last < min_interval:
-                await asyncio.sleep(min_interval - time_since_last)
+        for attempt in range(max_retries):
+            try:
+                # Use the DEX manager to get prices
+                price_data = await get_dex_manager().get_price(token_pair, dex_name, network)
                 
-        # Use semaphore to limit concurrent API calls
-        async with self.api_semaphore:
-            for attempt in range(max_retries):
-                try:
-                    # Use the DEX manager to get prices
-                    price_data = await dex_manager.get_price(token_pair, dex_name, network)
+                if price_data:
+                    # Add additional information if not already present
+                    if 'dex_name' not in price_data:
+                        price_data['dex_name'] = dex_name
+                    if 'network' not in price_data:
+                        price_data['network'] = network
+                    if 'timestamp' not in price_data:
+                        price_data['timestamp'] = time.time()
+                    return price_data
                     
-                    if price_data:
-                        # Add additional information if not already present
-                        if 'dex_name' not in price_data:
-                            price_data['dex_name'] = dex_name
-                        if 'network' not in price_data:
-                            price_data['network'] = network
-                        if 'timestamp' not in price_data:
-                            price_data['timestamp'] = time.time()
-                        return price_data
-                        
-                except Exception as e:
-                    logger.warning(f"Error fetching price from {dex_name} on {network} for {token_pair}: {str(e)}")
+            except Exception as e:
+                logger.warning(f"Error fetching price from {dex_name} on {network} for {token_pair}: {str(e)}")
+                
+                if attempt < max_retries - 1:
+                    # Exponential backoff with full jitter so retries against a
+                    # recovering DEX do not all land at the same moment
+                    sleep_time = random.uniform(0, base_delay * (2 ** attempt))
+                    await asyncio.sleep(sleep_time)
                     
-                    if attempt < max_retries - 1:
-                        # Exponential backoff
-                        sleep_time = base_delay * (2 ** attempt)
-                        await asyncio.sleep(sleep_time)
-                        
         logger.error(f"Failed to get price from {dex_name} on {network} for {token_pair} after {max_retries} attempts")
         return None
         
+    async def _fetch_price(self, dex_name: str, network: str, token_pair: str) -> Optional[Dict]:
+        """
+        Fetch one price for a refresh, skipping DEXs whose rate limit would
+        not allow the request within half an update interval
+        
+        Makes a single attempt: backoff retries would not fit in the tick
+        deadline, and a failed fetch is retried by the next refresh.
+        
+        Args:
+            dex_name: DEX name
+            network: Network name
+            token_pair: Token pair (e.g., "ETH-USDT")
+            
+        Returns:
+            Price data dictionary or None if skipped or failed
+        """
+        # Wait for rate limit quota before taking a concurrency slot
+        if not await self._acquire(dex_name, network, max_wait=self.update_interval_s * 0.5):
+            return None
+            
+        return await self._bounded(self.get_price_with_retry(dex_name, network, token_pair, max_retries=1))
+        
+    async def _bounded(self, coro):
+        """
+        Await a coroutine while holding a slot of the API semaphore
+        
+        Args:
+            coro: Coroutine to run
+            
+        Returns:
+            Result of the coroutine
+        """
+        async with self.api_semaphore:
+            return await coro
+            
+    def _get_bucket(self, dex_name: str, network: str) -> dict:
+        """
+        Get the token bucket for a DEX and network, creating it on first use
+        
+        Args:
+            dex_name: DEX name
+            network: Network name
+            
+        Returns:
+            Bucket state dictionary
+        """
+        rate_limit_key = f"{dex_name}_{network}"
+        bucket = self.buckets.get(rate_limit_key)
+        if bucket is None:
+            dex_interface = get_dex_manager().get_dex_interface(dex_name, network)
+            min_interval = getattr(dex_interface, 'min_api_interval', 0.5) or 0.5
+            bucket = self.buckets[rate_limit_key] = {
+                'tokens': self.rate_limit_burst,
+                'last_refill': asyncio.get_running_loop().time(),
+                'rate': 1.0 / min_interval,
+                'capacity': self.rate_limit_burst
+            }
+        return bucket
+        
+    async def _acquire(self, dex_name: str, network: str, max_wait: Optional[float] = None) -> bool:
+        """
+        Take one token from the DEX's bucket, waiting for a refill if it is empty
+        
+        Args:
+            dex_name: DEX name
+            network: Network name
+            max_wait: Longest acceptable wait for a token in seconds, or None to always wait
+            
+        Returns:
+            True if a token was taken, False if it would take longer than max_wait
+        """
+        bucket = self._get_bucket(dex_name, network)
+        
+        # Refill and reserve in one step without awaiting, so concurrent callers
+        # never see the same tokens; a negative balance queues later callers
+        now = asyncio.get_running_loop().time()
+        bucket['tokens'] = min(bucket['capacity'], bucket['tokens'] + (now - bucket['last_refill']) * bucket['rate'])
+        bucket['last_refill'] = now
+        
+        wait = max(0.0, (1 - bucket['tokens']) / bucket['rate'])
+        if max_wait is not None and wait > max_wait:
+            rate_limit_key = f"{dex_name}_{network}"
+            self.rate_limited[rate_limit_key] = self.rate_limited.get(rate_limit_key, 0) + 1
+            logger.debug(f"Skipping {dex_name} on {network} this tick, rate limited for {wait:.2f}s")
+            return False
+            
+        bucket['tokens'] -= 1
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                # Cancelled at the tick deadline before the request was made
+                bucket['tokens'] += 1
+                raise
+        return True
+        
     async def save_prices_to_db(self, price_data_list: List[Dict]):
         """
-        Save price data to database
+        Queue price data for the background DB writer
         
         Args:
             price_data_list: List of price data dictionaries
         """
-        try:
-            from api.app import app
+        self.queue_prices_for_db(price_data_list)
+        
+    def queue_prices_for_db(self, price_data_list: List[Dict]):
+        """
+        Queue price data for the background DB writer without waiting for the write
+        
+        Args:
+            price_data_list: List of price data dictionaries
+        """
+        if not price_data_list:
+            return
             
-            async def _save_to_db():
-                with app.app_context():
-                    for price_data in price_data_list:
-                        try:
-                            # Extract token addresses from pair
-                            tokens = price_data['token_pair'].split('-')
-                            if len(tokens) != 2:
-                                continue
-                                
-                            token_a, token_b = tokens
-                            
-                            # Get token addresses (simplified)
-                            token_addresses = json.loads(os.environ.get("TOKEN_ADDRESSES", "{}"))
-                            token_address = token_addresses.get(f"{token_a}_{price_data['network']}")
-                            
-                            if not token_address:
-                                continue
-                                
-                            # Create or update price record
-                            price_record = TokenPrice(
-                                token_address=token_address,
-                                token_symbol=token_a,
-                                dex_name=price_data['dex_name'],
-                                price_usd=price_data['price'],
-                                network=price_data['network'],
-                                liquidity_usd=price_data.get('liquidity'),
-                                timestamp=datetime.fromtimestamp(price_data['timestamp'])
-                            )
-                            
-                            db.session.add(price_record)
-                        except Exception as e:
-                            logger.error(f"Error adding price record: {str(e)}")
-                    
-                    # Commit all changes after processing all records
-                    try:
-                        db.session.commit()
-                    except Exception as e:
-                        logger.error(f"Error committing price records: {str(e)}")
-                        db.session.rollback()
+        self._start_db_writer()
+        if self._write_q.full():
+            self._write_q.get_nowait()
+            self._write_q.task_done()
+            logger.warning("Price DB writer is behind, dropped the oldest queued batch")
+        self._write_q.put_nowait(price_data_list)
+        
+    def _start_db_writer(self):
+        """Start the background DB writer if it is not running"""
+        if self._db_executor is None:
+            self._db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="price-db")
+        if self._writer_task is None or self._writer_task.done():
+            self._writer_task = asyncio.create_task(self._db_writer())
             
-            # Run database operation in a separate thread to avoid blocking
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, _save_to_db)
+    async def _db_writer(self):
+        """Write queued price batches on the dedicated DB thread, one transaction per drain"""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            price_data_list = list(await self._write_q.get())
             
-        except Exception as e:
-            logger.error(f"Error saving prices to database: {str(e)}")
+            # Coalesce batches queued while the previous write was running
+            batches = 1
+            while batches < self.db_write_batch_limit and not self._write_q.empty():
+                price_data_list.extend(self._write_q.get_nowait())
+                batches += 1
+                
+            try:
+                await loop.run_in_executor(self._db_executor, self._save_to_db, price_data_list)
+            except Exception as e:
+                logger.error(f"Error saving prices to database: {str(e)}")
+            finally:
+                for _ in range(batches):
+                    self._write_q.task_done()
+                
+    def _save_to_db(self, price_data_list: List[Dict]):
+        """
+        Save price data to database
+        
+        Runs on the DB writer thread.
+        
+        Args:
+            price_data_list: List of price data dictionaries
+        """
+        if self._app is None:
+            from api.app import app
+            self._app = app
             
+        with self._app.app_context():
+            token_addresses = dex_interfaces.get_token_addresses()
+            
+            rows = []
+            for price_data in price_data_list:
+                try:
+                    # Extract token addresses from pair
+                    tokens = self._split_pair(price_data['token_pair'])
+                    if len(tokens) != 2:
+                        continue
+                        
+                    token_a, token_b = tokens
+                    token_address = token_addresses.get(f"{token_a}_{price_data['network']}")
+                    
+                    if not token_address:
+                        continue
+                        
+                    rows.append({
+                        'token_address': token_address,
+                        'token_symbol': token_a,
+                        'dex_name': price_data['dex_name'],
+                        'price_usd': price_data['price'],
+                        'network': price_data['network'],
+                        'liquidity_usd': price_data.get('liquidity'),
+                        'timestamp': datetime.fromtimestamp(price_data['timestamp'])
+                    })
+                except Exception as e:
+                    logger.error(f"Error adding price record: {str(e)}")
+                    
+            if not rows:
+                return
+                
+            # Insert all records in one executemany, skipping the ORM unit of work
+            try:
+                db.session.bulk_insert_mappings(TokenPrice, rows)
+                db.session.commit()
+            except Exception as e:
+                logger.error(f"Error committing price records: {str(e)}")
+                db.session.rollback()
+                
     async def get_latest_prices(self) -> List[Dict]:
         """
         Get latest price data for all tokens and DEXs
@@ -203,27 +568,32 @@ class PriceAggregator:
         Returns:
             List of normalized price data dictionaries
         """
-        # Return cached data if recent enough
-        current_time = time.time() * 1000  # Convert to ms
-        if current_time - self.last_update < self.update_interval * 2 and self.price_cache:
-            return list(self.price_cache.values())
-            
-        # Otherwise, trigger an update and then return
-        await self.update_prices()
+        await self._refresh_if_stale()
+        
+        live_prices = list(self.iter_latest_prices())
         
         # If cache is still empty, fetch prices directly
-        if not self.price_cache:
+        if not live_prices:
+            results = await asyncio.gather(
+                *(self._bounded(get_dex_manager().get_all_prices(token_pair)) for token_pair in self.token_list),
+                return_exceptions=True
+            )
+            
             all_prices = []
-            for token_pair in self.token_list:
-                try:
-                    prices = await dex_manager.get_all_prices(token_pair)
+            for token_pair, prices in zip(self.token_list, results):
+                if isinstance(prices, Exception):
+                    logger.error(f"Error fetching prices for {token_pair}: {str(prices)}")
+                else:
                     all_prices.extend(prices)
-                except Exception as e:
-                    logger.error(f"Error fetching prices for {token_pair}: {str(e)}")
             return all_prices
             
-        return list(self.price_cache.values())
+        return live_prices
         
+    async def _refresh_if_stale(self):
+        """Refresh the price cache if it is empty or older than two update intervals"""
+        if time.monotonic() - self.last_update >= self.update_interval_s * 2 or not self.price_cache:
+            await self.update_prices()
+            
     async def get_price_for_token_pair(self, token_pair: str, dex_name: str = None, 
                                        network: str = None) -> List[Dict]:
         """
@@ -240,7 +610,7 @@ class PriceAggregator:
         # If we have specific filters, try to get the data directly
         if dex_name and network:
             try:
-                result = await dex_manager.get_price(token_pair, dex_name, network)
+                result = await get_dex_manager().get_price(token_pair, dex_name, network)
                 if result:
                     # Ensure timestamp is present
                     if 'timestamp' not in result:
@@ -255,33 +625,38 @@ class PriceAggregator:
             try:
                 if network and not dex_name:
                     # Get all prices for this token pair on the specified network
+                    dexes = config.get_enabled_dexes(network)
+                    prices = await asyncio.gather(
+                        *(self._bounded(get_dex_manager().get_price(token_pair, dex, network)) for dex in dexes),
+                        return_exceptions=True
+                    )
+                    
                     all_prices = []
-                    for dex in config.get_enabled_dexes(network):
-                        price = await dex_manager.get_price(token_pair, dex, network)
-                        if price:
+                    for dex, price in zip(dexes, prices):
+                        if isinstance(price, Exception):
+                            logger.warning(f"Error getting price for {token_pair} on {dex} ({network}): {str(price)}")
+                        elif price:
                             if 'timestamp' not in price:
                                 price['timestamp'] = time.time()
                             all_prices.append(price)
                     return all_prices
                 else:
-                    # Use cached data with filtering
-                    all_prices = await self.get_latest_prices()
+                    # Use cached data with filtering, or fetch the pair
+                    # directly if the cache is still empty after a refresh
+                    await self._refresh_if_stale()
                     
-                    # Filter by token pair
-                    results = [p for p in all_prices if p['token_pair'] == token_pair]
-                    
-                    # Apply additional filters if provided
-                    if dex_name:
-                        results = [p for p in results if p['dex_name'] == dex_name]
-                        
-                    if network:
-                        results = [p for p in results if p['network'] == network]
+                    if self.price_cache:
+                        candidates = self._live_pair_prices(token_pair)
+                    else:
+                        candidates = await get_dex_manager().get_all_prices(token_pair)
                         
-                    return results
+                    return [
+                        p for p in candidates
+                        if (not dex_name or p['dex_name'] == dex_name) and (not network or p['network'] == network)
+                    ]
             except Exception as e:
                 logger.error(f"Error getting price for {token_pair}: {str(e)}")
                 return []
         else:
             # Use cached data for all prices
-            all_prices = list(self.price_cache.values())
-            return [p for p in all_prices if p['token_pair'] == token_pair]
+            return self._live_pair_prices(token_pair)
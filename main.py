@@ -1,4 +1,5 @@
 import os
+import sys
 import logging
 from api.app import app
 import asyncio
@@ -113,9 +114,17 @@ async def start_backend_services():
                 discord_webhook=os.environ.get("DISCORD_WEBHOOK")
             )
             
+            # Connect to the blockchain networks without blocking the event loop
+            from core.web3_manager import get_web3_manager
+            web3_manager = await get_web3_manager()
+            
             # Initialize price aggregator (using singleton dex_manager)
             price_aggregator = PriceAggregator()
             
+            # Warm DNS and connections to the DEX APIs in the background
+            from dexs.dex_manager import get_dex_manager
+            dns_prewarm_task = asyncio.create_task(get_dex_manager().prewarm())
+            
             # Initialize prediction engine
             prediction_engine = PredictionEngine(
                 model_path=None,  # Auto-detect the best model
@@ -149,7 +158,13 @@ async def start_backend_services():
             )
             
             # Start services in separate threads/processes
-            await flash_loan_orchestrator.start_monitoring()
+            try:
+                await flash_loan_orchestrator.start_monitoring()
+            finally:
+                # Stop background warm-up and release the relay and RPC sessions
+                dns_prewarm_task.cancel()
+                await execution_engine.close()
+                await web3_manager.close()
             
         except Exception as e:
             logger.error(f"Error initializing AI components: {str(e)}")
@@ -159,6 +174,30 @@ async def start_backend_services():
         logger.error(f"Failed to start backend services: {str(e)}")
         # We'll proceed with just the web interface in this case
 
+def create_event_loop():
+    """
+    Create the event loop for the backend services
+    
+    Uses uvloop unless USE_UVLOOP is disabled or uvloop is not installed. On
+    Windows, where uvloop is unavailable, a selector loop is used instead of
+    the default proactor loop.
+    
+    Returns:
+        New event loop
+    """
+    if sys.platform == "win32":
+        return asyncio.SelectorEventLoop()
+        
+    if os.environ.get("USE_UVLOOP", "true").lower() == "true":
+        try:
+            import uvloop
+            logger.info("Using uvloop event loop")
+            return uvloop.new_event_loop()
+        except ImportError:
+            logger.warning("uvloop is not installed, using asyncio loop")
+            
+    return asyncio.new_event_loop()
+
 def start_api_server():
     """Start the API server"""
     try:
@@ -173,7 +212,7 @@ if __name__ == "__main__":
         initialize_database()
         
         # Start backend in a separate thread
-        loop = asyncio.new_event_loop()
+        loop = create_event_loop()
         asyncio.set_event_loop(loop)
         
         # Create a task for the backend services
@@ -0,0 +1,19 @@
+import json
+
+# orjson is an optional speedup; fall back to the standard library parser
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    json_loads = orjson.loads
+else:
+    json_loads = json.loads
+
+if orjson is not None:
+    json_dumps_bytes = orjson.dumps
+else:
+    def json_dumps_bytes(obj) -> bytes:
+        """Serialize obj to UTF-8 encoded JSON"""
+        return json.dumps(obj).encode('utf-8')